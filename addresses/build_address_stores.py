@@ -0,0 +1,20 @@
+from pathlib import Path
+import pickle
+
+from app.classes.address_store import AddressStore
+
+# run from the repo root: python -m addresses.build_address_stores
+ADDRESSES_DIR = Path(__file__).parent
+
+
+def main():
+    for net in ["mainnet", "testnet"]:
+        with open(ADDRESSES_DIR / f"{net}_addresses_to_indexes.pickle", "rb") as fp:
+            addresses_to_indexes = pickle.load(fp)
+        path = ADDRESSES_DIR / f"{net}_addresses.store"
+        AddressStore.build(addresses_to_indexes, path)
+        print(f"{net}: {len(addresses_to_indexes)} addresses in {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import bisect
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+# canonical account addresses are the first 29 characters of the address.
+KEY_WIDTH = 29
+MAGIC = b"CCDADDR2"
+# magic, number of addresses, highest account index.
+HEADER = struct.Struct("<8sQq")
+# most lookups are for the same few (recent, busy) accounts, so the results
+# of the last searches are kept, well under a MB.
+LOOKUP_CACHE_SIZE = 4_096
+
+
+def aligned(offset: int, to: int = 8) -> int:
+    return offset + (-offset % to)
+
+
+class SortedKeys:
+    """The fixed width keys of a store as a sequence, so bisect can search them."""
+
+    def __init__(self, buffer: mmap.mmap | bytes, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offset + i * KEY_WIDTH
+        return self.buffer[start : start + KEY_WIDTH]
+
+
+class AddressStore:
+    """
+    Canonical account address to account index for one net, in a file with
+    the sorted addresses at a fixed width, followed by their indexes. The
+    file is memory mapped read only, so all workers share one copy of it in
+    the page cache, and a lookup is a binary search, in front of which sits
+    a small LRU of the last results. Accounts that are added at runtime go
+    in a small dict on top.
+
+    The other way around, account indexes are dense, so the file ends with an
+    array over all indexes up to the highest one, holding the position of
+    the address in the sorted addresses (-1 if unknown).
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.count = 0
+        self.keys = SortedKeys(b"", 0, 0)
+        self.indexes: memoryview | list[int] = []
+        self.positions: memoryview | list[int] = []
+        self.max_index = 0
+        self.overlay: dict[str, int] = {}
+        self.overlay_addresses: dict[int, str] = {}
+        self.recent: OrderedDict[str, int | None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.open(path)
+
+    def open(self, path: Path):
+        with open(path, "rb") as fp:
+            self.mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, max_index = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an address store.")
+        keys_offset = HEADER.size
+        indexes_offset = aligned(keys_offset + count * KEY_WIDTH)
+        self.count = count
+        self.max_index = max_index
+        self.keys = SortedKeys(self.mm, keys_offset, count)
+        self.indexes = memoryview(self.mm)[
+            indexes_offset : indexes_offset + count * 8
+        ].cast("q")
+        positions_offset = indexes_offset + count * 8
+        self.positions = memoryview(self.mm)[
+            positions_offset : positions_offset + (max_index + 1) * 4
+        ].cast("i")
+        self.recent.clear()
+
+    @staticmethod
+    def build(addresses_to_indexes: dict[str, int], path: Path):
+        """Writes a store file, next to path first, so readers never see half of it."""
+        items = sorted(
+            (canonical.encode(), index)
+            for canonical, index in addresses_to_indexes.items()
+            if len(canonical) == KEY_WIDTH
+        )
+        keys = b"".join(key for key, _ in items)
+        max_index = max((index for _, index in items), default=0)
+        header = HEADER.pack(MAGIC, len(items), max_index)
+        positions = array("i", [-1]) * (max_index + 1)
+        for position, (_, index) in enumerate(items):
+            positions[index] = position
+        padding = b"\0" * (aligned(len(header) + len(keys)) - len(header) - len(keys))
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(header)
+            fp.write(keys)
+            fp.write(padding)
+            # native byte order, the store is built where it is used.
+            array("q", (index for _, index in items)).tofile(fp)
+            positions.tofile(fp)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    def get(self, canonical: str) -> int | None:
+        index = self.overlay.get(canonical)
+        if index is not None:
+            return index
+        # the file doesn't change once open, so misses are remembered too.
+        if canonical in self.recent:
+            self.recent.move_to_end(canonical)
+            self.hits += 1
+            return self.recent[canonical]
+        self.misses += 1
+        index = self.search(canonical)
+        self.recent[canonical] = index
+        if len(self.recent) > LOOKUP_CACHE_SIZE:
+            self.recent.popitem(last=False)
+        return index
+
+    def search(self, canonical: str) -> int | None:
+        key = canonical.encode()
+        i = bisect.bisect_left(self.keys, key)
+        if i < self.count and self.keys[i] == key:
+            return self.indexes[i]
+        return None
+
+    def address_of(self, index: int) -> str | None:
+        """The canonical address of an account index, None if unknown."""
+        canonical = self.overlay_addresses.get(index)
+        if canonical is not None:
+            return canonical
+        if 0 <= index < len(self.positions) and self.positions[index] >= 0:
+            return self.keys[self.positions[index]].decode()
+        return None
+
+    def __contains__(self, canonical: str) -> bool:
+        return self.get(canonical) is not None
+
+    def __getitem__(self, canonical: str) -> int:
+        index = self.get(canonical)
+        if index is None:
+            raise KeyError(canonical)
+        return index
+
+    def __setitem__(self, canonical: str, index: int):
+        if self.get(canonical) != index:
+            self.overlay[canonical] = index
+            self.overlay_addresses[index] = canonical
+        self.max_index = max(self.max_index, index)
+
+    def update(self, addresses_to_indexes: dict[str, int]):
+        for canonical, index in addresses_to_indexes.items():
+            self[canonical] = index
+
+    def __len__(self) -> int:
+        return self.count + len(self.overlay)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path) if self.path else None,
+            "addresses": self.count,
+            "indexes": len(self.positions),
+            "added": len(self.overlay),
+            "max_index": self.max_index,
+            "lookup_cache": {
+                "entries": len(self.recent),
+                "hits": self.hits,
+                "misses": self.misses,
+            },
+        }
+
+
+def is_current(path: Path) -> bool:
+    """Whether the store exists and has the format this version reads."""
+    if not path.exists():
+        return False
+    with open(path, "rb") as fp:
+        return fp.read(len(MAGIC)) == MAGIC
+
+
+def open_address_store(directory: Path, net: str) -> AddressStore:
+    """
+    Opens the store of a net, building it from the pickle first if the pickle
+    is all there is (or newer, or the store has an older format).
+    """
+    path = directory / f"{net}_addresses.store"
+    pickle_path = directory / f"{net}_addresses_to_indexes.pickle"
+    if pickle_path.exists() and (
+        not is_current(path) or pickle_path.stat().st_mtime > path.stat().st_mtime
+    ):
+        with open(pickle_path, "rb") as fp:
+            AddressStore.build(pickle.load(fp), path)
+    return AddressStore(path)
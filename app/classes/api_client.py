@@ -0,0 +1,134 @@
+import importlib.util
+import re
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+
+class TimeoutClass(BaseModel):
+    """
+    Read timeout for API urls whose path matches `pattern`, the first match wins.
+    Urls that match no class get the default timeout.
+    """
+
+    name: str
+    pattern: str
+    timeout: float
+
+
+class APIClientSettings(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30
+    http2: bool = False
+    connect_timeout: float = 5
+    # how long a request may wait for a free connection from the pool.
+    pool_timeout: float = 5
+    default_timeout: float = 10
+    heavy_timeout: float = 60
+    # hedge the routes that opt in, see HedgedRequests.
+    hedging: bool = False
+    # retries on connection errors
+    retries: int = 2
+
+    @classmethod
+    def from_environment(cls, environment: dict):
+        settings = {}
+        for field in cls.model_fields:
+            value = environment.get(f"API_{field.upper()}")
+            if value not in (None, ""):
+                settings[field] = value
+        return cls(**settings)
+
+
+class APIClientMetrics:
+    """Saturation of the connection pool and timeouts per timeout class."""
+
+    def __init__(self, max_connections: int = 0):
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.pool_timeouts = 0
+        self.timeouts: dict[str, int] = {}
+
+    def start(self):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end(self):
+        self.in_flight -= 1
+
+    def timed_out(self, timeout_class: str, error: httpx.TimeoutException):
+        if isinstance(error, httpx.PoolTimeout):
+            self.pool_timeouts += 1
+        self.timeouts[timeout_class] = self.timeouts.get(timeout_class, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "saturation": (
+                (self.in_flight / self.max_connections) if self.max_connections else 0
+            ),
+            "requests": self.requests,
+            "pool_timeouts": self.pool_timeouts,
+            "timeouts": self.timeouts,
+        }
+
+
+class APIClientConfig:
+    """
+    Builds the shared httpx client for the API and decides the timeout for
+    every request made with it.
+    """
+
+    def __init__(
+        self, settings: APIClientSettings, timeout_classes: list[TimeoutClass]
+    ):
+        self.settings = settings
+        self.timeout_classes = [(re.compile(t.pattern), t) for t in timeout_classes]
+        self.metrics = APIClientMetrics(settings.max_connections)
+        self.http2 = settings.http2 and (importlib.util.find_spec("h2") is not None)
+        if settings.http2 and not self.http2:
+            print("API_HTTP2 is set, but the h2 package is missing. Using HTTP/1.1.")
+        self.timeouts = {
+            t.name: self._timeout(t.timeout) for _, t in self.timeout_classes
+        }
+        self.timeouts["default"] = self._timeout(settings.default_timeout)
+
+    def _timeout(self, read: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            read,
+            connect=self.settings.connect_timeout,
+            pool=self.settings.pool_timeout,
+        )
+
+    def timeout_class_for(self, url: str) -> str:
+        path = urlsplit(url).path
+        for regex, timeout_class in self.timeout_classes:
+            if regex.search(path):
+                return timeout_class.name
+        return "default"
+
+    def create_client(self, headers: dict) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeouts["default"],
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry,
+            ),
+            http2=self.http2,
+            headers=headers,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "settings": self.settings.model_dump(),
+            **self.metrics.stats(),
+        }
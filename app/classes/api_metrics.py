@@ -0,0 +1,68 @@
+import re
+from urllib.parse import urlsplit
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+# words like "transactions-for-flow" or "v2", hashes are long and ids contain digits.
+STATIC_SEGMENT = re.compile(r"^[a-z][a-z_\-]{0,31}[0-9]?$")
+# segments after these are always values, even if they look like a word.
+PARAMETER_AFTER = {"search", "cns-domain", "site_user", "tag", "plt"}
+# a bug in the normalization must not blow up the number of series.
+MAX_ROUTE_TEMPLATES = 1_000
+
+
+class APIRouteMetrics:
+    """
+    Prometheus metrics for calls to the API, per normalized route template
+    (`/v2/{net}/account/{}/info`), so hundreds of urls collapse to a few series.
+    """
+
+    def __init__(self, registry: CollectorRegistry | None = None):
+        self.registry = registry or CollectorRegistry()
+        self.templates: set[str] = set()
+        self.duration = Histogram(
+            "ccdexplorer_api_request_duration_seconds",
+            "Duration of requests to the API.",
+            ["method", "route"],
+            buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+            registry=self.registry,
+        )
+        self.responses = Counter(
+            "ccdexplorer_api_responses_total",
+            "Responses from the API by status code, error for no response.",
+            ["method", "route", "status"],
+            registry=self.registry,
+        )
+        self.received = Counter(
+            "ccdexplorer_api_received_bytes_total",
+            "Bytes received from the API.",
+            ["method", "route"],
+            registry=self.registry,
+        )
+
+    def route_template(self, url: str) -> str:
+        segments = []
+        previous = ""
+        for segment in urlsplit(url).path.strip("/").split("/"):
+            if segment in ["mainnet", "testnet"]:
+                segments.append("{net}")
+            elif STATIC_SEGMENT.match(segment) and previous not in PARAMETER_AFTER:
+                segments.append(segment)
+            else:
+                segments.append("{}")
+            previous = segment
+        template = "/" + "/".join(segments)
+        if template not in self.templates:
+            if len(self.templates) >= MAX_ROUTE_TEMPLATES:
+                return "other"
+            self.templates.add(template)
+        return template
+
+    def observe(
+        self, method: str, url: str, status_code: int, duration: float, size: int
+    ):
+        route = self.route_template(url)
+        self.duration.labels(method, route).observe(duration)
+        status = str(status_code) if status_code > 0 else "error"
+        self.responses.labels(method, route, status).inc()
+        self.received.labels(method, route).inc(size)
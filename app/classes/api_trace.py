@@ -0,0 +1,117 @@
+from contextvars import ContextVar
+
+# the most calls listed individually in the Server-Timing header.
+MAX_SERVER_TIMING_CALLS = 20
+
+
+class APICall:
+    """One call to the API as seen by the request that made it."""
+
+    __slots__ = (
+        "method",
+        "route",
+        "url",
+        "status_code",
+        "start",
+        "duration",
+        "size",
+        "source",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        route: str,
+        url: str,
+        status_code: int,
+        start: float,
+        duration: float,
+        size: int,
+        source: str,
+    ):
+        self.method = method
+        self.route = route
+        self.url = url
+        self.status_code = status_code
+        # time.monotonic() when the call started.
+        self.start = start
+        self.duration = duration
+        self.size = size
+        # upstream, cached, coalesced (shared another request's call) or stale.
+        self.source = source
+
+
+class APITrace:
+    """The API calls made while handling one request, in the order they finished."""
+
+    def __init__(self):
+        self.calls: list[APICall] = []
+
+    def record(self, call: APICall):
+        self.calls.append(call)
+
+    @property
+    def duration(self) -> float:
+        """
+        Time spent waiting on the API: calls run concurrently, so this is the
+        time covered by at least one call, not the sum of their durations.
+        """
+        total = 0.0
+        covered_until = None
+        for call in sorted(self.calls, key=lambda call: call.start):
+            end = call.start + call.duration
+            if covered_until is None or call.start >= covered_until:
+                total += call.duration
+                covered_until = end
+            elif end > covered_until:
+                total += end - covered_until
+                covered_until = end
+        return total
+
+    @property
+    def size(self) -> int:
+        return sum(call.size for call in self.calls)
+
+    def server_timing(self) -> str:
+        entries = [
+            f'api;dur={self.duration * 1000:.1f};desc="{len(self.calls)} API calls"'
+        ]
+        for index, call in enumerate(self.calls[:MAX_SERVER_TIMING_CALLS]):
+            desc = f"{call.method} {call.route} {call.status_code} {call.source}"
+            entries.append(f'api-{index};dur={call.duration * 1000:.1f};desc="{desc}"')
+        return ", ".join(entries)
+
+
+api_trace: ContextVar[APITrace | None] = ContextVar("api_trace", default=None)
+
+
+class APITraceMiddleware:
+    """
+    Starts an API trace for every http request, available to the templates as
+    `request.state.api_trace`, and sends it along as a Server-Timing header.
+    Calls made while a response is streamed come after the header is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = APITrace()
+        token = api_trace.set(trace)
+        scope.setdefault("state", {})["api_trace"] = trace
+
+        async def send_with_server_timing(message):
+            if message["type"] == "http.response.start" and trace.calls:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            api_trace.reset(token)
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Awaitable
+
+
+class CircuitState(Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive upstream failures (connect errors and timeouts) for
+    one route.
+    After `failure_threshold` failures the circuit opens and requests are not
+    sent upstream anymore. Every `reset_timeout` seconds one probe is let
+    through (half open), its success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_task: asyncio.Future | None = None
+        self.opened = 0
+        self.short_circuited = 0
+
+    def is_open(self) -> bool:
+        return self.state != CircuitState.closed
+
+    def should_probe(self) -> bool:
+        if self.state == CircuitState.closed:
+            return False
+        if self.probe_task is not None and not self.probe_task.done():
+            return False
+        if (time.monotonic() - self.opened_at) < self.reset_timeout:
+            return False
+        self.state = CircuitState.half_open
+        return True
+
+    def probe(self, coro: Awaitable):
+        # keep a reference, so the task isn't garbage collected while it runs.
+        self.probe_task = asyncio.ensure_future(coro)
+
+    def record_success(self):
+        self.state = CircuitState.closed
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if (self.state == CircuitState.half_open) or (
+            self.failures >= self.failure_threshold
+        ):
+            if self.state == CircuitState.closed:
+                self.opened += 1
+            self.state = CircuitState.open
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class CircuitBreakers:
+    """
+    One CircuitBreaker per route template, as the API metrics normalize it
+    (`/v2/{net}/account/{}/balance`), so one failing route doesn't cut off
+    its neighbours.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def for_route(self, route: str) -> CircuitBreaker:
+        breaker = self.breakers.get(route)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.breakers[route] = breaker
+        return breaker
+
+    def stats(self) -> dict:
+        return {route: b.stats() for route, b in self.breakers.items()}
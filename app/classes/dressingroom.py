@@ -115,19 +115,10 @@ class MakeUp:
             self.net = self.net.split(".")[1].lower()
 
     async def get_schema_from_source(self, contract_address: CCD_ContractAddress):
-        result_from_cache = self.app.schema_cache[self.net].get(
-            contract_address.to_str()
-        )
+        cache_key = (self.net, contract_address.to_str())
+        result_from_cache = self.app.schema_cache.get(cache_key)
         if result_from_cache:
-            now = dt.datetime.now().astimezone(dt.UTC)
-            if (now - result_from_cache["timestamp"]).total_seconds() < 5:
-                schema = self.app.schema_cache[self.net][contract_address.to_str()][
-                    "schema"
-                ]
-                source_module_name = self.app.schema_cache[self.net][
-                    contract_address.to_str()
-                ]["source_module_name"]
-                return schema, source_module_name
+            return result_from_cache.value
 
         api_result = await get_url_from_api(
             f"{self.app.api_url}/v2/{self.net}/contract/{contract_address.index}/{contract_address.subindex}/schema-from-source",
@@ -151,11 +142,9 @@ class MakeUp:
         source_module_name = api_repsonse["source_module_name"]
 
         # add to cache
-        self.app.schema_cache[self.net][contract_address.to_str()] = {
-            "schema": schema,
-            "source_module_name": source_module_name,
-            "timestamp": dt.datetime.now().astimezone(dt.UTC),
-        }
+        self.app.schema_cache.set(
+            cache_key, (schema, source_module_name), size=len(ms_bytes)
+        )
 
         return schema, source_module_name
 
@@ -273,32 +262,11 @@ class MakeUp:
                 )
 
     async def get_domain_from_collection(self):
-        result_from_cache = self.app.cns_domain_cache[self.net].get(
-            self.cns_domain.tokenId
+        api_result = await get_url_from_api(
+            f"{self.app.api_url}/v2/{self.net}/misc/cns-domain/{self.cns_domain.tokenId}",
+            self.httpx_client,
         )
-        from_cache = False
-        if result_from_cache:
-            now = dt.datetime.now().astimezone(dt.UTC)
-            if (now - result_from_cache["timestamp"]).total_seconds() < 5:
-                self.cns_domain.domain_name = self.app.cns_domain_cache[self.net][
-                    self.cns_domain.tokenId
-                ]["domain_name"]
-                from_cache = True
-
-        if not from_cache:
-            api_result = await get_url_from_api(
-                f"{self.app.api_url}/v2/{self.net}/misc/cns-domain/{self.cns_domain.tokenId}",
-                self.httpx_client,
-            )
-            self.cns_domain.domain_name = (
-                api_result.return_value if api_result.ok else ""
-            )
-
-            # add to cache
-            self.app.cns_domain_cache[self.net][self.cns_domain.tokenId] = {
-                "domain_name": self.cns_domain.domain_name,
-                "timestamp": dt.datetime.now().astimezone(dt.UTC),
-            }
+        self.cns_domain.domain_name = api_result.return_value if api_result.ok else ""
 
     async def set_possible_cns_domain_from_update(
         self, effect_updated: CCD_InstanceUpdatedEvent
@@ -1432,30 +1400,11 @@ class MakeUp:
         contract_address: CCD_ContractAddress,
     ):
         success = False
-        from_cache = False
-        result_from_cache = self.app.token_information_cache[self.net].get(
-            contract_address.to_str()
+        api_result = await get_url_from_api(
+            f"{self.app.api_url}/v2/{self.net}/contract/{contract_address.index}/{contract_address.subindex}/token-information",
+            self.httpx_client,
         )
-        if result_from_cache:
-            now = dt.datetime.now().astimezone(dt.UTC)
-            if (now - result_from_cache["timestamp"]).total_seconds() < 5:
-                token_information = self.app.token_information_cache[self.net][
-                    contract_address.to_str()
-                ]["token_information"]
-                from_cache = True
-
-        if not from_cache:
-            api_result = await get_url_from_api(
-                f"{self.app.api_url}/v2/{self.net}/contract/{contract_address.index}/{contract_address.subindex}/token-information",
-                self.httpx_client,
-            )
-            token_information = api_result.return_value if api_result.ok else None
-
-        # add to cache
-        self.app.token_information_cache[self.net][contract_address.to_str()] = {
-            "token_information": token_information,
-            "timestamp": dt.datetime.now().astimezone(dt.UTC),
-        }
+        token_information = api_result.return_value if api_result.ok else None
 
         # if token_information:
         ProcessEventRequest.model_rebuild()
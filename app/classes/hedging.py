@@ -0,0 +1,144 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import httpx
+
+# errors where the request most likely never reached the API, safe to retry.
+RETRYABLE_ERRORS = (
+    httpx.ConnectError,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+    httpx.WriteError,
+)
+
+
+class LatencyTracker:
+    """Recent durations per route, to derive the p95 a hedge waits for."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self.durations: dict[str, deque] = {}
+
+    def record(self, route: str, duration: float):
+        durations = self.durations.get(route)
+        if durations is None:
+            durations = deque(maxlen=self.window)
+            self.durations[route] = durations
+        durations.append(duration)
+
+    def p95(self, route: str) -> float | None:
+        durations = self.durations.get(route)
+        if not durations or len(durations) < self.min_samples:
+            return None
+        ordered = sorted(durations)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class HedgedRequests:
+    """
+    GETs with bounded, jittered retries on connection errors and, for the
+    routes that opt in, a hedge: if the first attempt takes longer than the
+    p95 of the route, a second one is sent and the first response wins.
+    """
+
+    def __init__(
+        self,
+        hedged_routes: list[str],
+        hedging: bool = False,
+        retries: int = 2,
+        retry_backoff: float = 0.1,
+        min_hedge_delay: float = 0.05,
+    ):
+        self.hedged_routes = [re.compile(pattern) for pattern in hedged_routes]
+        self.hedging = hedging
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.min_hedge_delay = min_hedge_delay
+        self.latency = LatencyTracker()
+        self.hedges = 0
+        self.hedges_won = 0
+        self.retried = 0
+        self.retries_exhausted = 0
+
+    def is_hedged(self, url: str) -> bool:
+        path = urlsplit(url).path
+        return self.hedging and any(regex.search(path) for regex in self.hedged_routes)
+
+    async def get(
+        self, httpx_client: httpx.AsyncClient, url: str, route: str, **kwargs
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                if self.is_hedged(url):
+                    return await self._hedged_get(httpx_client, url, route, **kwargs)
+                return await httpx_client.get(url, **kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt >= self.retries:
+                    self.retries_exhausted += 1
+                    raise
+                attempt += 1
+                self.retried += 1
+                # full jitter, so retries from many requests don't line up.
+                await asyncio.sleep(
+                    random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+                )
+
+    async def _hedged_get(
+        self, httpx_client: httpx.AsyncClient, url: str, route: str, **kwargs
+    ) -> httpx.Response:
+        start = time.monotonic()
+        first = asyncio.ensure_future(httpx_client.get(url, **kwargs))
+        delay = self.latency.p95(route)
+        if delay is None:
+            # not enough samples yet to know what slow is.
+            response = await first
+            self.latency.record(route, time.monotonic() - start)
+            return response
+
+        try:
+            done, _ = await asyncio.wait(
+                {first}, timeout=max(delay, self.min_hedge_delay)
+            )
+        except asyncio.CancelledError:
+            # asyncio.wait leaves the attempt running, it isn't wanted anymore.
+            first.cancel()
+            raise
+        if done:
+            response = first.result()
+            self.latency.record(route, time.monotonic() - start)
+            return response
+
+        self.hedges += 1
+        second = asyncio.ensure_future(httpx_client.get(url, **kwargs))
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedges_won += 1
+                        self.latency.record(route, time.monotonic() - start)
+                        return task.result()
+            # both attempts failed, raise the error of the first.
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "hedging": self.hedging,
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+            "retried": self.retried,
+            "retries_exhausted": self.retries_exhausted,
+        }
@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+
+class JobRun:
+    """Set ok to False when a run didn't get (all of) its data."""
+
+    def __init__(self):
+        self.ok = True
+
+
+class JobMetrics:
+    """
+    Duration and staleness of the background jobs. Staleness is the time since
+    the last run that got all of its data, so it shows when the caches a job
+    fills are getting old, even while the job itself keeps running.
+    """
+
+    def __init__(self, registry: CollectorRegistry | None = None):
+        self.registry = registry or CollectorRegistry()
+        self.last_success: dict[str, float] = {}
+        self.last_duration: dict[str, float] = {}
+        self.skips: dict[str, int] = {}
+        self.duration = Histogram(
+            "ccdexplorer_scheduler_job_duration_seconds",
+            "Duration of background job runs.",
+            ["job"],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+            registry=self.registry,
+        )
+        self.runs = Counter(
+            "ccdexplorer_scheduler_job_runs_total",
+            "Background job runs, by whether they got all of their data.",
+            ["job", "result"],
+            registry=self.registry,
+        )
+        self.skipped = Counter(
+            "ccdexplorer_scheduler_job_skipped_total",
+            "Runs skipped because the previous run was still going.",
+            ["job"],
+            registry=self.registry,
+        )
+        self.staleness = Gauge(
+            "ccdexplorer_scheduler_job_staleness_seconds",
+            "Seconds since the last run that got all of its data.",
+            ["job"],
+            registry=self.registry,
+        )
+
+    @contextmanager
+    def timed(self, job: str):
+        if job not in self.last_success:
+            # counts from the first run until there is a good one.
+            self.last_success[job] = time.time()
+            self.staleness.labels(job).set_function(
+                lambda: time.time() - self.last_success[job]
+            )
+        run = JobRun()
+        start = time.monotonic()
+        try:
+            yield run
+        except BaseException:
+            run.ok = False
+            raise
+        finally:
+            duration = time.monotonic() - start
+            self.last_duration[job] = duration
+            self.duration.labels(job).observe(duration)
+            self.runs.labels(job, "ok" if run.ok else "failed").inc()
+            if run.ok:
+                self.last_success[job] = time.time()
+
+    def skip(self, job: str):
+        self.skips[job] = self.skips.get(job, 0) + 1
+        self.skipped.labels(job).inc()
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            job: {
+                "last_duration": round(self.last_duration.get(job, 0), 3),
+                "staleness": round(now - last_success, 3),
+                "skipped": self.skips.get(job, 0),
+            }
+            for job, last_success in self.last_success.items()
+        }
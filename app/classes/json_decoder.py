@@ -0,0 +1,28 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONDecoder:
+    """
+    Decodes API response bodies. Uses orjson when it is installed (and not
+    switched off with backend="json"), the stdlib decoder otherwise.
+    """
+
+    def __init__(self, backend: str | None = None):
+        if backend not in (None, "", "orjson", "json"):
+            raise ValueError(f"Unknown JSON decoder backend {backend}.")
+        if backend == "orjson" and orjson is None:
+            print("API_JSON_DECODER is orjson, but orjson is missing. Using json.")
+        self.backend = (
+            "orjson" if (orjson is not None and backend != "json") else "json"
+        )
+
+    def loads(self, content: bytes) -> Any:
+        if self.backend == "orjson":
+            return orjson.loads(content)
+        return json.loads(content)
@@ -0,0 +1,68 @@
+import codecs
+import json
+from typing import Any
+
+WHITESPACE = " \t\r\n"
+DELIMITERS = WHITESPACE + ",]"
+
+
+class JSONArrayItemDecoder:
+    """
+    Decodes a JSON array that arrives in chunks, item by item, so every item
+    can be used (and dropped) as soon as it is complete. Only the partial item
+    at the end of the last chunk is kept in memory.
+    """
+
+    def __init__(self):
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk: bytes, final: bool = False) -> list[Any]:
+        items = []
+        self.buffer += self.text_decoder.decode(chunk, final)
+        buffer = self.buffer
+        end = len(buffer)
+        pos = 0
+        while pos < end:
+            c = buffer[pos]
+            if c in WHITESPACE:
+                pos += 1
+            elif self.finished:
+                raise ValueError("Unexpected data after the JSON array.")
+            elif not self.started:
+                if c != "[":
+                    raise ValueError("Response is not a JSON array.")
+                self.started = True
+                pos += 1
+            elif c == ",":
+                pos += 1
+            elif c == "]":
+                self.finished = True
+                pos += 1
+            else:
+                try:
+                    item, item_end = self.json_decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # incomplete item, wait for the next chunk.
+                    break
+                if (item_end == end or buffer[item_end] not in DELIMITERS) and (
+                    not final
+                ):
+                    # a number cut off by the end of the chunk ("12" of "12.5")
+                    # continues in the next one.
+                    break
+                items.append(item)
+                pos = item_end
+        self.buffer = buffer[pos:]
+        return items
+
+    def close(self) -> list[Any]:
+        items = self.feed(b"", final=True)
+        if not self.finished:
+            raise ValueError("JSON array ended prematurely.")
+        return items
@@ -0,0 +1,131 @@
+from ccdexplorer_fundamentals.GRPCClient.CCD_Types import CCD_ContractAddress
+from prometheus_client import CollectorRegistry, Counter
+
+
+def account_label_html(label: str) -> str:
+    return f'<i class="bi bi-person-bounding-box pe-1"></i><span style="font-family: monospace, monospace;" class="small">{label}</span>'
+
+
+def account_link_html(net: str, value: str | int, tag_label: str) -> str:
+    return f'<a class="" href="/{net}/account/{value}">{tag_label}</a>'
+
+
+def instance_link_html(net: str, value: CCD_ContractAddress, tag_label: str) -> str:
+    return f'<a class="" href="/{net}/contract/{value.index}/{value.subindex}"><i class="bi bi-card-checklist"></i> {tag_label}</a>'
+
+
+def unlabeled_instance_html(value: CCD_ContractAddress) -> str:
+    return f"<span class='ccd'>{(value.to_str())}</span>"
+
+
+class LabelService:
+    """
+    The community labels, indexed once per refresh: account index and contract
+    address to the html that `account_link`, `contract_tag` and
+    `instance_link_v2` show for them. Lookups with the labels this was built
+    from are hits, lookups with any other labels (a fallback fetch) are
+    misses and go through `labels_melt` instead.
+    """
+
+    def __init__(self, registry: CollectorRegistry | None = None):
+        self.registry = registry or CollectorRegistry()
+        self.tags: dict | None = None
+        self.account_labels: dict[str, str] = {}
+        self.account_links: dict[str, str] = {}
+        self.contract_labels: dict[str, str] = {}
+        self.contract_links: dict[str, str] = {}
+        self.hits: dict[str, int] = {"account": 0, "contract": 0}
+        self.misses: dict[str, int] = {"account": 0, "contract": 0}
+        self.lookups = Counter(
+            "ccdexplorer_label_lookups_total",
+            "Label lookups, by whether the precomputed index was used.",
+            ["kind", "result"],
+            registry=self.registry,
+        )
+
+    def refresh(self, tags: dict | None):
+        if tags is self.tags:
+            return
+        account_labels, account_links = {}, {}
+        contract_labels, contract_links = {}, {}
+        for key, tag in ((tags or {}).get("labels_melt") or {}).items():
+            if key.isdigit():
+                account_labels[key] = account_label_html(tag["label"])
+                # the community labels are mainnet labels.
+                account_links[key] = account_link_html(
+                    "mainnet", key, account_labels[key]
+                )
+            elif key.startswith("<"):
+                try:
+                    address = CCD_ContractAddress.from_str(key)
+                except ValueError as error:
+                    # one bad label shouldn't take the others down with it.
+                    print(f"Skipping label for {key}: {error!r}")
+                    continue
+                contract_labels[key] = tag["label"]
+                contract_links[key] = instance_link_html(
+                    "mainnet", address, tag["label"]
+                )
+        (
+            self.account_labels,
+            self.account_links,
+            self.contract_labels,
+            self.contract_links,
+        ) = (account_labels, account_links, contract_labels, contract_links)
+        self.tags = tags
+
+    def count(self, kind: str, tags: dict) -> bool:
+        hit = tags is self.tags
+        if hit:
+            self.hits[kind] += 1
+        else:
+            self.misses[kind] += 1
+        self.lookups.labels(kind, "hit" if hit else "miss").inc()
+        return hit
+
+    def account_label(self, account_index: str | int, tags: dict) -> str | None:
+        key = str(account_index)
+        if self.count("account", tags):
+            return self.account_labels.get(key)
+        tag = tags["labels_melt"].get(key)
+        return account_label_html(tag["label"]) if tag else None
+
+    def account_link(self, account_index: int, tags: dict) -> str:
+        """The mainnet link for an account, for visitors without labels of their own."""
+        key = str(account_index)
+        if self.count("account", tags):
+            link = self.account_links.get(key)
+        else:
+            tag = tags["labels_melt"].get(key)
+            link = (
+                account_link_html("mainnet", key, account_label_html(tag["label"]))
+                if tag
+                else None
+            )
+        return link or account_link_html("mainnet", key, account_label_html(key))
+
+    def contract_label(self, address: str, tags: dict) -> str | None:
+        if self.count("contract", tags):
+            return self.contract_labels.get(address)
+        tag = tags["labels_melt"].get(address)
+        return tag["label"] if tag else None
+
+    def contract_link(self, value: CCD_ContractAddress, tags: dict) -> str:
+        """The mainnet link for a contract instance."""
+        key = value.to_str()
+        if self.count("contract", tags):
+            link = self.contract_links.get(key)
+        else:
+            tag = tags["labels_melt"].get(key)
+            link = instance_link_html("mainnet", value, tag["label"]) if tag else None
+        return link or instance_link_html(
+            "mainnet", value, unlabeled_instance_html(value)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "accounts": len(self.account_labels),
+            "contracts": len(self.contract_labels),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
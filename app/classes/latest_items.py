@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Callable
+
+
+def block_height(block: dict) -> int:
+    return block["height"]
+
+
+def block_hash(block: dict) -> str:
+    return block["hash"]
+
+
+def transaction_height(transaction: dict) -> int:
+    return transaction["block_info"]["height"]
+
+
+def transaction_hash(transaction: dict) -> str:
+    return transaction["hash"]
+
+
+class LatestItems:
+    """
+    Ring buffer with the newest items (blocks, transactions) of a net, newest
+    first. It is filled once from `/last/{size}` and after that only with what
+    is newer than the newest item it has, the oldest items drop off the end.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        height_of: Callable[[dict], int],
+        key_of: Callable[[dict], str],
+    ):
+        self.size = size
+        # module level functions, so the buffer can be pickled as a snapshot.
+        self.height_of = height_of
+        self.key_of = key_of
+        self.items: deque[dict] = deque(maxlen=size)
+        self.keys: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def newest_height(self) -> int | None:
+        return self.height_of(self.items[0]) if self.items else None
+
+    @property
+    def oldest_height(self) -> int | None:
+        return self.height_of(self.items[-1]) if self.items else None
+
+    def latest(self, count: int) -> list[dict]:
+        return [self.items[i] for i in range(min(count, len(self.items)))]
+
+    def replace(self, items: list[dict]):
+        self.items.clear()
+        self.keys.clear()
+        self.add_newer(items)
+
+    def add_newer(self, items: list[dict]) -> list[dict]:
+        """Adds the items that aren't in the buffer yet, returns those, newest first."""
+        added = []
+        # oldest first, keeping the order the API uses within a block.
+        for item in sorted(reversed(items), key=self.height_of):
+            key = self.key_of(item)
+            if key in self.keys:
+                continue
+            if len(self.items) == self.size:
+                self.keys.discard(self.key_of(self.items[-1]))
+            self.items.appendleft(item)
+            self.keys.add(key)
+            added.insert(0, item)
+        return added
+
+    def covers(self, height: int) -> bool:
+        # the oldest height can be cut off halfway (more transactions in that
+        # block than fit), everything above it is complete.
+        return bool(self.items) and height >= self.oldest_height
+
+    def newer_than(self, height: int) -> list[dict] | None:
+        """Items above height, newest first, None if the buffer doesn't go back that far."""
+        if not self.covers(height):
+            return None
+        newer = []
+        for item in self.items:
+            if self.height_of(item) <= height:
+                break
+            newer.append(item)
+        return newer
@@ -0,0 +1,114 @@
+import fcntl
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+class LeaderElection:
+    """
+    One leader among the workers of a host: whoever holds an exclusive lock on
+    the lock file. The OS releases the lock when the leader exits (or crashes),
+    so the next worker that tries takes over.
+    """
+
+    def __init__(self, lock_path: Path):
+        self.lock_path = lock_path
+        self.fd: int | None = None
+        self.elected = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self.fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.fd is not None:
+            return True
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        self.elected += 1
+        return True
+
+    def release(self):
+        if self.fd is None:
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+    def stats(self) -> dict:
+        return {"pid": os.getpid(), "leader": self.is_leader, "elected": self.elected}
+
+
+class SnapshotStore:
+    """
+    Snapshots the leader publishes for all workers, one pickle file per name.
+    Files are replaced atomically, so a reader never sees half a snapshot.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        # inode and modification time of the snapshot this worker has, per name.
+        self.versions: dict[str, tuple[int, int]] = {}
+        self.published = 0
+        self.loaded = 0
+        self.failed = 0
+
+    def publish(self, name: str, value: Any):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.directory / f"{name}.pickle")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.published += 1
+
+    def read_if_changed(self, name: str) -> tuple[bool, Any]:
+        path = self.directory / f"{name}.pickle"
+        try:
+            stat = path.stat()
+            version = (stat.st_ino, stat.st_mtime_ns)
+            if self.versions.get(name) == version:
+                return False, None
+            with open(path, "rb") as fp:
+                value = pickle.load(fp)
+        except FileNotFoundError:
+            return False, None
+        except (
+            pickle.UnpicklingError,
+            EOFError,
+            AttributeError,
+            ImportError,
+            ValueError,
+        ) as error:
+            # keep the snapshot this worker has, and skip this file until the
+            # leader replaces it.
+            print(
+                f"Snapshot {name} could not be loaded, keeping the previous one: {error!r}"
+            )
+            self.versions[name] = version
+            self.failed += 1
+            return False, None
+        self.versions[name] = version
+        self.loaded += 1
+        return True, value
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "published": self.published,
+            "loaded": self.loaded,
+            "failed": self.failed,
+        }
@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import AsyncIterator
+
+
+class LiveStream(Enum):
+    blocks = "blocks"
+    transactions = "transactions"
+    accounts = "accounts"
+    smart_wallets = "smart_wallets"
+
+
+class LiveUpdates:
+    """
+    Broadcasts batches of new rows (already decorated for the tables) per net
+    and stream to everyone subscribed, for the SSE endpoints. The leader
+    publishes, the other workers replay the batches from its snapshot.
+    """
+
+    def __init__(self, history_size: int = 10, queue_size: int = 20):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.sequence = 0
+        self.history: dict[str, deque[tuple[int, list[dict]]]] = {}
+        # sequence of the last batch sent to the subscribers, per stream.
+        self.sent: dict[str, int] = {}
+        self.subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+        self.reloads = 0
+
+    def publish(self, net: str, stream: LiveStream, rows: list[dict]):
+        if not rows:
+            return
+        key = f"{net}/{stream.value}"
+        self.sequence += 1
+        self.history.setdefault(key, deque(maxlen=self.history_size)).append(
+            (self.sequence, rows)
+        )
+        self.published += 1
+        self._broadcast(key, self.sequence, rows)
+
+    def replay(self, history: dict[str, deque[tuple[int, list[dict]]]]):
+        """Sends the batches from the leader's history that weren't sent yet."""
+        self.history = history
+        for key, batches in history.items():
+            for sequence, rows in batches:
+                # continues from here if this worker becomes the leader.
+                self.sequence = max(self.sequence, sequence)
+                if sequence > self.sent.get(key, 0):
+                    self._broadcast(key, sequence, rows)
+
+    def _broadcast(self, key: str, sequence: int, rows: list[dict]):
+        self.sent[key] = sequence
+        for queue in list(self.subscribers.get(key, [])):
+            try:
+                queue.put_nowait((sequence, rows))
+            except asyncio.QueueFull:
+                # a client that doesn't keep up is disconnected, it reconnects
+                # and gets what it missed from the history.
+                self.subscribers[key].discard(queue)
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def missed(
+        self, key: str, last_event_id: int
+    ) -> list[tuple[int, list[dict] | None]]:
+        """
+        The batches after last_event_id, or a single batch without rows if some
+        of them aren't in the history anymore (the client reloads instead).
+        """
+        batches = list(self.history.get(key, []))
+        evicted = len(batches) == self.history_size and batches[0][0] > last_event_id
+        # a sequence this worker hasn't seen, from before a restart.
+        if evicted or last_event_id > self.sequence:
+            self.reloads += 1
+            return [(batches[-1][0] if batches else self.sequence, None)]
+        return [
+            (sequence, rows) for sequence, rows in batches if sequence > last_event_id
+        ]
+
+    async def subscribe(
+        self, net: str, stream: LiveStream, last_event_id: int | None = None
+    ) -> AsyncIterator[tuple[int, list[dict] | None]]:
+        """
+        (sequence, rows) for every batch published from now on. A client that
+        reconnects with the id of the last batch it got gets the batches it
+        missed first.
+        """
+        key = f"{net}/{stream.value}"
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # subscribed before the history is read, so nothing falls in between.
+        self.subscribers.setdefault(key, set()).add(queue)
+        try:
+            sent = 0
+            if last_event_id is not None:
+                for sequence, rows in self.missed(key, last_event_id):
+                    sent = sequence
+                    yield sequence, rows
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                if batch[0] > sent:
+                    yield batch
+        finally:
+            self.subscribers[key].discard(queue)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "dropped": self.dropped,
+            "reloads": self.reloads,
+            "subscribers": {
+                key: len(queues) for key, queues in self.subscribers.items()
+            },
+        }
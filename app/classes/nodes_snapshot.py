@@ -0,0 +1,96 @@
+import operator
+import re
+
+COMPARISONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def version_key(version: str) -> tuple[int, ...]:
+    # 10.0.1 sorts after 9.0.7.
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+SORT_KEYS = {
+    "name": str.casefold,
+    "version": version_key,
+}
+
+
+class NodesSnapshot:
+    """
+    The nodes and validators of a net, flattened once per refresh into one
+    list per column, with the sort order of every sortable column worked out
+    up front. A page is then a filter over the indices and a slice.
+    """
+
+    def __init__(
+        self,
+        rows: list[dict],
+        sortable: tuple[str, ...],
+        nodes_validators: dict,
+        last_payday_block: dict | None,
+    ):
+        self.fields = tuple(rows[0]) if rows else ()
+        self.columns: dict[str, list] = {
+            field: [row[field] for row in rows] for field in self.fields
+        }
+        self.size = len(rows)
+        # indices with a value in sort order, plus the ones without, which go
+        # last in both directions.
+        self.orders: dict[str, tuple[list[int], list[int]]] = {}
+        for field in sortable:
+            values = self.columns.get(field, [])
+            key = SORT_KEYS.get(field)
+            present = [i for i, value in enumerate(values) if value is not None]
+            present.sort(key=lambda i: key(values[i]) if key else values[i])
+            missing = [i for i, value in enumerate(values) if value is None]
+            self.orders[field] = (present, missing)
+        # the documents themselves, for the html view.
+        self.nodes_validators = nodes_validators
+        self.last_payday_block = last_payday_block
+
+    def row(self, index: int) -> dict:
+        return {field: self.columns[field][index] for field in self.fields}
+
+    def matches(self, index: int, filters: list[tuple[str, str, str]]) -> bool:
+        for field, type_, wanted in filters:
+            value = self.columns[field][index]
+            if value is None:
+                return False
+            if type_ == "like":
+                if wanted.casefold() not in str(value).casefold():
+                    return False
+                continue
+            compare = COMPARISONS.get(type_, operator.eq)
+            try:
+                if isinstance(value, (int, float)):
+                    wanted_value = float(wanted)
+                else:
+                    value, wanted_value = str(value), wanted
+                if not compare(value, wanted_value):
+                    return False
+            except (TypeError, ValueError):
+                return False
+        return True
+
+    def query(
+        self,
+        sort_key: str,
+        direction: str,
+        filters: list[tuple[str, str, str]],
+        skip: int,
+        limit: int,
+    ) -> tuple[list[dict], int]:
+        """One page of rows and the number of rows that match the filters."""
+        present, missing = self.orders.get(sort_key) or (list(range(self.size)), [])
+        ordered = (present[::-1] if direction == "desc" else present) + missing
+        filters = [f for f in filters if f[0] in self.columns]
+        if filters:
+            ordered = [i for i in ordered if self.matches(i, filters)]
+        return [self.row(i) for i in ordered[skip : skip + limit]], len(ordered)
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class PlanStep:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        depends_on: list[str],
+        skip_if_missing: bool,
+    ):
+        self.name = name
+        self.fn = fn
+        self.depends_on = depends_on
+        self.skip_if_missing = skip_if_missing
+
+
+class PageDataPlan:
+    """
+    Declarative description of the data a page needs.
+    Every step is an async function that receives the results of the steps it
+    depends on as keyword arguments. Steps without dependencies all start at
+    once, a dependent step starts as soon as its inputs have arrived.
+    If `skip_if_missing` is set (the default) and one of the inputs is None,
+    the step is not run and its result is None.
+    """
+
+    def __init__(self):
+        self.steps: dict[str, PlanStep] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        depends_on: list[str] | None = None,
+        skip_if_missing: bool = True,
+    ):
+        depends_on = depends_on or []
+        for dependency in depends_on:
+            if dependency not in self.steps:
+                raise ValueError(f"Step {name} depends on unknown step {dependency}.")
+        self.steps[name] = PlanStep(name, fn, depends_on, skip_if_missing)
+        return self
+
+    async def run(self) -> dict[str, Any]:
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(step: PlanStep):
+            inputs = {}
+            for dependency in step.depends_on:
+                inputs[dependency] = await tasks[dependency]
+            if step.skip_if_missing and any(v is None for v in inputs.values()):
+                return None
+            return await step.fn(**inputs)
+
+        # steps can only depend on steps added before them, so all tasks
+        # a step waits on exist by the time it starts running.
+        for name, step in self.steps.items():
+            tasks[name] = asyncio.ensure_future(run_step(step))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return dict(zip(tasks.keys(), results))
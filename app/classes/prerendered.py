@@ -0,0 +1,29 @@
+import gzip
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class PrerenderedFragment:
+    """
+    An html fragment rendered (and gzipped) once in the background, served
+    as is to every request that would render the same thing.
+    """
+
+    __slots__ = ("body", "gzipped")
+
+    def __init__(self, html: str):
+        self.body = html.encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=6)
+
+    def response(self, request: Request) -> Response:
+        # GZipMiddleware leaves responses with a Content-Encoding alone.
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                self.gzipped,
+                media_type="text/html",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return Response(
+            self.body, media_type="text/html", headers={"Vary": "Accept-Encoding"}
+        )
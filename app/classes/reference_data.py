@@ -0,0 +1,29 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+# where each field comes from, all mainnet.
+REFERENCE_ROUTES = {
+    "exchange_rates": "/v2/mainnet/misc/exchange-rates",
+    "labeled_accounts": "/v2/mainnet/misc/community-labeled-accounts",
+    "original_labeled_accounts": "/v2/mainnet/misc/labeled-accounts",
+    "credential_issuers": "/v2/mainnet/misc/credential-issuers",
+}
+
+
+class ReferenceData(BaseModel):
+    """
+    Small documents that most pages need (exchange rates, labels, credential
+    issuers, nodes). A background job builds a new one when any of them
+    changes and swaps it in whole, so requests only read, and always see
+    one consistent version. None means it hasn't been fetched yet.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    exchange_rates: Optional[dict] = None
+    labeled_accounts: Optional[dict] = None
+    original_labeled_accounts: Optional[dict] = None
+    credential_issuers: Optional[Any] = None
+    # per net.
+    nodes: Optional[dict] = None
@@ -0,0 +1,232 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel
+
+
+class CachePolicy(BaseModel):
+    """
+    Caching rule for API urls whose path matches `pattern`.
+    `ttl=None` means the resource is immutable and never expires (it can still
+    be evicted when the cache for this policy is full).
+    `negative_ttl` is how long a 404 is remembered, 0 means 404s aren't cached.
+    `stale_ttl` is how long an expired 200 is kept around, to be served when the
+    upstream is down.
+    `no_store` keeps matching urls out of the cache altogether, for responses
+    that must always come from the upstream (and urls that hold secrets).
+    """
+
+    name: str
+    pattern: str
+    ttl: Optional[float] = 10
+    max_entries: int = 1_000
+    max_bytes: int = 16 * 1024 * 1024
+    negative_ttl: float = 0
+    stale_ttl: float = 0
+    no_store: bool = False
+
+
+class CacheEntry:
+    __slots__ = ("value", "size", "expires_at", "stale_until", "validators")
+
+    def __init__(
+        self,
+        value: Any,
+        size: int,
+        expires_at: Optional[float],
+        stale_until: Optional[float] = None,
+        validators: Optional[dict] = None,
+    ):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        # ETag / Last-Modified of the response, to revalidate it when expired.
+        self.validators = validators
+
+
+class TTLLRUCache:
+    """
+    Bounded key/value store. Entries expire after their ttl and the least
+    recently used entries are evicted once `max_entries` or `max_bytes` is hit.
+    Expired entries are kept for another `stale_ttl` seconds, `get` ignores
+    them but `get_stale` still returns them.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 10,
+        max_entries: int = 1_000,
+        max_bytes: int = 16 * 1024 * 1024,
+        stale_ttl: float = 0,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Any, CacheEntry] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.revalidated = 0
+
+    def get(self, key: Any) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = time.monotonic()
+        if entry.expires_at is not None and entry.expires_at <= now:
+            if entry.stale_until is None or entry.stale_until <= now:
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: Any) -> Optional[CacheEntry]:
+        """The entry for key, even if expired (but not past its stale window)."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until is not None and entry.stale_until <= time.monotonic():
+            return None
+        return entry
+
+    def get_stale(self, key: Any) -> Optional[CacheEntry]:
+        entry = self.peek(key)
+        if entry is not None:
+            self.stale_hits += 1
+        return entry
+
+    def set(
+        self,
+        key: Any,
+        value: Any,
+        size: int = 0,
+        ttl: Optional[float] = -1,
+        stale_ttl: float = -1,
+        validators: Optional[dict] = None,
+    ):
+        ttl = self.ttl if ttl == -1 else ttl
+        stale_ttl = self.stale_ttl if stale_ttl == -1 else stale_ttl
+        if size > self.max_bytes:
+            # would evict everything else and still not fit.
+            return
+        if key in self.entries:
+            self._remove(key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        stale_until = None if expires_at is None else expires_at + stale_ttl
+        self.entries[key] = CacheEntry(value, size, expires_at, stale_until, validators)
+        self.bytes += size
+        while (len(self.entries) > self.max_entries) or (self.bytes > self.max_bytes):
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: Any):
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "revalidated": self.revalidated,
+        }
+
+
+class ResponseCache:
+    """
+    Cache for API responses, with one TTLLRUCache per policy.
+    The first policy whose pattern matches the url path is used, urls that
+    match no policy (or a `no_store` one) are not cached.
+    Cached responses are shared between requests, so treat them as read-only.
+    """
+
+    def __init__(self, policies: list[CachePolicy]):
+        self.policies = policies
+        self.compiled = [(re.compile(p.pattern), p) for p in policies]
+        self.stores = {
+            p.name: TTLLRUCache(p.ttl, p.max_entries, p.max_bytes, p.stale_ttl)
+            for p in policies
+            if not p.no_store
+        }
+
+    def policy_for(self, url: str) -> Optional[CachePolicy]:
+        path = urlsplit(url).path
+        for regex, policy in self.compiled:
+            if regex.search(path):
+                return None if policy.no_store else policy
+        return None
+
+    def get(self, url: str) -> Any:
+        policy = self.policy_for(url)
+        if not policy:
+            return None
+        entry = self.stores[policy.name].get(url)
+        return entry.value if entry else None
+
+    def get_stale(self, url: str) -> Any:
+        """Last good response for url, even if it has expired."""
+        policy = self.policy_for(url)
+        if not policy:
+            return None
+        entry = self.stores[policy.name].get_stale(url)
+        return entry.value if entry else None
+
+    def get_for_revalidation(self, url: str) -> Optional[CacheEntry]:
+        """Expired entry for url that can be revalidated with a conditional GET."""
+        policy = self.policy_for(url)
+        if not policy:
+            return None
+        entry = self.stores[policy.name].peek(url)
+        return entry if (entry is not None and entry.validators) else None
+
+    def revalidated(self, url: str, entry: CacheEntry, value: Any):
+        """The upstream answered 304, so the entry is fresh for another ttl."""
+        policy = self.policy_for(url)
+        if not policy:
+            return
+        store = self.stores[policy.name]
+        store.revalidated += 1
+        store.set(url, value, entry.size, policy.ttl, validators=entry.validators)
+
+    def put(
+        self,
+        url: str,
+        value: Any,
+        status_code: int,
+        size: int,
+        validators: Optional[dict] = None,
+    ):
+        policy = self.policy_for(url)
+        if not policy:
+            return
+        if status_code == 200:
+            self.stores[policy.name].set(
+                url, value, size, policy.ttl, validators=validators
+            )
+        elif status_code == 404 and policy.negative_ttl > 0:
+            # a 404 is not a last good value.
+            self.stores[policy.name].set(url, value, size, policy.negative_ttl, 0)
+
+    def stats(self) -> dict:
+        return {name: store.stats() for name, store in self.stores.items()}
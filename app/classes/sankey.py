@@ -2,7 +2,6 @@ from enum import Enum
 from ..utils import (
     account_label_on_index,
     contract_tag,
-    # get_address_identifiers,
     from_address_to_index,
 )  # , convert_contract_str_to_type
 from ccdexplorer_fundamentals.mongodb import MongoImpactedAddress
@@ -280,7 +279,7 @@ class SanKey:
         self.graph_dict["receiver_accounts"] = len(self.as_receiver_dict)
         self.graph_dict["sender_accounts"] = len(self.as_sender_dict)
 
-    def add_txs_for_account(
+    async def add_txs_for_account(
         self, txs_for_account, account_rewards_total  # , exchange_rates
     ):
         self.count_txs_as_receiver = 0
@@ -292,7 +291,7 @@ class SanKey:
             "amount": account_rewards_total / 1_000_000,
             "account_id": "Rewards",
         }
-        for ia in txs_for_account:
+        async for ia in txs_for_account:
             ia = MongoImpactedAddress(**ia)
             if ia.balance_movement:
                 if ia.balance_movement.transfer_in:
@@ -359,7 +358,7 @@ class SanKey:
         for _, v in self.as_sender_dict.items():
             self.add_link(self.account_id, v, WhoHasLinkInfo.TARGET)
 
-    def add_plt_txs_for_account(
+    async def add_plt_txs_for_account(
         self,
         txs_for_account,
         governance_account: CCD_AccountAddress,  # , exchange_rates
@@ -369,7 +368,7 @@ class SanKey:
         self.as_receiver_dict = {}
         self.as_sender_dict = {}
         # add account rewards
-        for ia in txs_for_account:
+        async for ia in txs_for_account:
             ia = MongoImpactedAddress(**ia)
             if ia.balance_movement:
                 if ia.balance_movement.plt_transfer_in:
@@ -437,7 +436,7 @@ class SanKey:
         for _, v in self.as_sender_dict.items():
             self.add_link(self.account_id, v, WhoHasLinkInfo.TARGET)
 
-    def add_txs_for_account_for_token(
+    async def add_txs_for_account_for_token(
         self,
         txs_for_account: list[MongoTypeLoggedEventV2],
         decimals: int,
@@ -448,7 +447,7 @@ class SanKey:
         self.as_receiver_dict = {}
         self.as_sender_dict = {}
         self.display_name = display_name
-        for event in txs_for_account:
+        async for event in txs_for_account:
             if not isinstance(event, MongoTypeLoggedEventV2):
                 event = MongoTypeLoggedEventV2(**event)
             if event.event_info.event_type == "CIS-2.mint_event":
@@ -0,0 +1,201 @@
+import asyncio
+import re
+import time
+from enum import Enum
+
+import httpx
+from ccdexplorer_fundamentals.GRPCClient.CCD_Types import (
+    CCD_BlockInfo,
+    CCD_BlockItemSummary,
+)
+from pydantic import BaseModel, ConfigDict
+
+from app.utils import get_url_from_api
+
+BASE58_CHARS = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+RE_HASH = re.compile(r"^[0-9a-fA-F]{64}$")
+RE_HEX = re.compile(r"^[0-9a-fA-F]+$")
+RE_DIGITS = re.compile(r"^[0-9]+$")
+RE_BASE58 = re.compile(f"^[{BASE58_CHARS}]+$")
+
+
+class SearchLookup(Enum):
+    accounts = "accounts"
+    block = "block"
+    transaction = "transaction"
+    modules = "modules"
+    tokens = "tokens"
+    contracts = "contracts"
+
+
+class SearchPlan(BaseModel):
+    lookups: list[SearchLookup]
+    # a hit on one lookup rules out the others, so the first hit is the answer.
+    exclusive: bool = False
+
+
+def classify_search_value(value: str) -> SearchPlan:
+    """Decide which lookups can possibly match, based on the shape of the value."""
+    if RE_HASH.match(value):
+        return SearchPlan(
+            lookups=[
+                SearchLookup.block,
+                SearchLookup.transaction,
+                SearchLookup.modules,
+                SearchLookup.tokens,
+            ],
+            exclusive=True,
+        )
+    if len(value) == 50 and RE_BASE58.match(value):
+        # a full account address
+        return SearchPlan(lookups=[SearchLookup.accounts], exclusive=True)
+    if RE_DIGITS.match(value):
+        return SearchPlan(
+            lookups=[
+                SearchLookup.accounts,
+                SearchLookup.block,
+                SearchLookup.modules,
+                SearchLookup.tokens,
+                SearchLookup.contracts,
+            ]
+        )
+    lookups = []
+    if RE_BASE58.match(value):
+        lookups.append(SearchLookup.accounts)
+    if RE_HEX.match(value):
+        lookups.append(SearchLookup.modules)
+    lookups.extend([SearchLookup.tokens, SearchLookup.contracts])
+    return SearchPlan(lookups=lookups)
+
+
+class SearchLatency:
+    """Per lookup latency, to see which lookups are worth firing."""
+
+    def __init__(self):
+        self.count = {x: 0 for x in SearchLookup}
+        self.hits = {x: 0 for x in SearchLookup}
+        self.cancelled = {x: 0 for x in SearchLookup}
+        self.total_sec = {x: 0.0 for x in SearchLookup}
+        self.max_sec = {x: 0.0 for x in SearchLookup}
+
+    def record(self, lookup: SearchLookup, duration: float, hit: bool):
+        self.count[lookup] += 1
+        self.hits[lookup] += 1 if hit else 0
+        self.total_sec[lookup] += duration
+        self.max_sec[lookup] = max(self.max_sec[lookup], duration)
+
+    def stats(self) -> dict:
+        return {
+            x.value: {
+                "count": self.count[x],
+                "hits": self.hits[x],
+                "cancelled": self.cancelled[x],
+                "avg_sec": (self.total_sec[x] / self.count[x]) if self.count[x] else 0,
+                "max_sec": self.max_sec[x],
+            }
+            for x in SearchLookup
+        }
+
+
+search_latency = SearchLatency()
+
+
+class SearchResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    accounts_list: list = []
+    block_info: CCD_BlockInfo | None = None
+    tx: CCD_BlockItemSummary | None = None
+    modules: list = []
+    tokens: list = []
+    contracts: list = []
+    # lookup result key -> url, a single entry means we can redirect.
+    single_urls: dict[str, str] = {}
+    redirect_url: str | None = None
+
+
+class SearchResolver:
+    def __init__(self, api_url: str, httpx_client: httpx.AsyncClient, net: str):
+        self.api_url = api_url
+        self.httpx_client = httpx_client
+        self.net = net
+
+    async def lookup(self, lookup: SearchLookup, value: str):
+        net = self.net
+        url = {
+            SearchLookup.accounts: f"/v2/{net}/accounts/search/{value}",
+            SearchLookup.block: f"/v2/{net}/block/{value}",
+            SearchLookup.transaction: f"/v2/{net}/transaction/{value}",
+            SearchLookup.modules: f"/v2/{net}/modules/search/{value}",
+            SearchLookup.tokens: f"/v2/{net}/tokens/search/{value}",
+            SearchLookup.contracts: f"/v2/{net}/contracts/search/{value}",
+        }[lookup]
+        start = time.monotonic()
+        api_result = await get_url_from_api(f"{self.api_url}{url}", self.httpx_client)
+        found = api_result.return_value if api_result.ok else None
+        if lookup == SearchLookup.block and found:
+            found = CCD_BlockInfo(**found)
+        if lookup == SearchLookup.transaction and found:
+            found = CCD_BlockItemSummary(**found)
+        search_latency.record(lookup, time.monotonic() - start, bool(found))
+        return lookup, found
+
+    def add_to_result(self, result: SearchResult, lookup: SearchLookup, found):
+        net = self.net
+        if not found:
+            return
+        if lookup == SearchLookup.accounts:
+            result.accounts_list = found
+            for a in found:
+                result.single_urls[f"account-{a['account_index']}"] = (
+                    f"/{net}/account/{a['account_index']}"
+                )
+        elif lookup == SearchLookup.block:
+            result.block_info = found
+            result.single_urls["block"] = f"/{net}/block/{found.height}"
+        elif lookup == SearchLookup.transaction:
+            result.tx = found
+            result.single_urls["transaction"] = f"/{net}/transaction/{found.hash}"
+        elif lookup == SearchLookup.modules:
+            result.modules = found
+            for m in found:
+                result.single_urls[f"module-{m['_id']}"] = f"/{net}/module/{m['_id']}"
+        elif lookup == SearchLookup.contracts:
+            result.contracts = found
+            for c in found:
+                result.single_urls[f"contract-{c['_id']}"] = (
+                    f"/{net}/contract/{c['_id']}"
+                )
+        elif lookup == SearchLookup.tokens:
+            result.tokens = found
+            for t in found:
+                result.single_urls[f"token-{t['_id']}"] = f"/{net}/tokens/{t['_id']}"
+
+    async def resolve(self, value: str) -> SearchResult:
+        plan = classify_search_value(value)
+        result = SearchResult()
+        tasks = {
+            asyncio.ensure_future(self.lookup(lookup, value)): lookup
+            for lookup in plan.lookups
+        }
+        pending = set(tasks.keys())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception():
+                        continue
+                    lookup, found = task.result()
+                    self.add_to_result(result, lookup, found)
+                if plan.exclusive and len(result.single_urls) == 1:
+                    break
+        finally:
+            for task in pending:
+                search_latency.cancelled[tasks[task]] += 1
+                task.cancel()
+
+        if len(result.single_urls) == 1:
+            result.redirect_url = list(result.single_urls.values())[0]
+        return result
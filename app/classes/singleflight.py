@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight upstream call.
+    The first caller for a key starts the call, everyone arriving while it is
+    still running awaits the same task and gets its result.
+    """
+
+    def __init__(self):
+        self.in_flight: dict[Hashable, asyncio.Task] = {}
+        self.requests = 0
+        self.upstream = 0
+        self.merged = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            self.upstream += 1
+            task = asyncio.ensure_future(fn())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.merged += 1
+
+        # shielded, so a caller that is cancelled (client went away) does not
+        # cancel the upstream call for the other callers waiting on it.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            # retrieve the exception, so asyncio doesn't log it as never retrieved
+            # when all callers have already gone away.
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "upstream": self.upstream,
+            "merged": self.merged,
+            "in_flight": len(self.in_flight),
+            "merge_ratio": (self.merged / self.requests) if self.requests else 0.0,
+        }
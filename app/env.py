@@ -8,6 +8,23 @@ API_URL = os.environ.get("API_URL")
 CCDEXPLORER_API_KEY = os.environ.get("CCDEXPLORER_API_KEY")
 SENTRY_DSN = os.environ.get("SENTRY_DSN")
 SENTRY_ENVIRONMENT = os.environ.get("SENTRY_ENVIRONMENT")
+# connection pool and timeouts for the API client, unset means the default.
+API_MAX_CONNECTIONS = os.environ.get("API_MAX_CONNECTIONS")
+API_MAX_KEEPALIVE_CONNECTIONS = os.environ.get("API_MAX_KEEPALIVE_CONNECTIONS")
+API_KEEPALIVE_EXPIRY = os.environ.get("API_KEEPALIVE_EXPIRY")
+API_HTTP2 = os.environ.get("API_HTTP2")
+API_CONNECT_TIMEOUT = os.environ.get("API_CONNECT_TIMEOUT")
+API_POOL_TIMEOUT = os.environ.get("API_POOL_TIMEOUT")
+API_DEFAULT_TIMEOUT = os.environ.get("API_DEFAULT_TIMEOUT")
+API_HEAVY_TIMEOUT = os.environ.get("API_HEAVY_TIMEOUT")
+API_HEDGING = os.environ.get("API_HEDGING")
+API_RETRIES = os.environ.get("API_RETRIES")
+# "orjson" (default when installed) or "json"
+API_JSON_DECODER = os.environ.get("API_JSON_DECODER")
+# lock file and snapshots shared by the uvicorn workers, defaults to a temp dir.
+WORKER_SHARED_DIR = os.environ.get("WORKER_SHARED_DIR")
+# bearer token (or ?token=) for /metrics and /metrics/api-client, unset hides them.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
 environment = {
     "SITE_URL": SITE_URL,
     "CCDEXPLORER_API_KEY": CCDEXPLORER_API_KEY,
@@ -15,4 +32,17 @@ environment = {
     "SENTRY_ENVIRONMENT": SENTRY_ENVIRONMENT,
     "SENTRY_DSN": SENTRY_DSN,
     "NET": "mainnet",
+    "API_MAX_CONNECTIONS": API_MAX_CONNECTIONS,
+    "API_MAX_KEEPALIVE_CONNECTIONS": API_MAX_KEEPALIVE_CONNECTIONS,
+    "API_KEEPALIVE_EXPIRY": API_KEEPALIVE_EXPIRY,
+    "API_HTTP2": API_HTTP2,
+    "API_CONNECT_TIMEOUT": API_CONNECT_TIMEOUT,
+    "API_POOL_TIMEOUT": API_POOL_TIMEOUT,
+    "API_DEFAULT_TIMEOUT": API_DEFAULT_TIMEOUT,
+    "API_HEAVY_TIMEOUT": API_HEAVY_TIMEOUT,
+    "API_HEDGING": API_HEDGING,
+    "API_RETRIES": API_RETRIES,
+    "API_JSON_DECODER": API_JSON_DECODER,
+    "WORKER_SHARED_DIR": WORKER_SHARED_DIR,
+    "METRICS_TOKEN": METRICS_TOKEN,
 }
@@ -47,6 +47,7 @@ templates.env.filters["token_amount_using_decimals_rounded"] = (
 )
 templates.env.filters["from_address_to_index"] = from_address_to_index  # noqa: F405
 templates.env.filters["apy_perc"] = apy_perc  # noqa: F405
+templates.env.filters["has_personal_labels"] = has_personal_labels  # noqa: F405
 
 
 templates.env.filters["cooldown_string"] = cooldown_string  # noqa: F405
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from contextlib import asynccontextmanager
 from ccdexplorer_fundamentals.tooter import Tooter
@@ -13,6 +14,7 @@ from ccdexplorer_fundamentals.GRPCClient.CCD_Types import (
 )
 from fastapi.middleware.gzip import GZipMiddleware
 
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, JobSubmissionEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 
@@ -35,6 +37,16 @@ from app.routers import tokens
 from app.routers import nodes
 from app.routers import staking
 from app.routers import smart_wallets
+from app.routers import metrics
+from app.routers import live_updates as live_updates_router
+from app.routers.home import render_last_blocks, render_last_txs
+from app.routers.nodes import build_nodes_snapshot
+from app.routers.staking import build_staking_page
+from app.routers.live_updates import (
+    decorate_latest_transactions,
+    decorate_smart_wallet_transactions,
+    get_community_labels,
+)
 from app.routers.charts import charts_home
 from app.routers.charts import (
     sc_accounts_growth,
@@ -43,11 +55,35 @@ from app.routers.charts import (
     sc_holders,
     sc_plt_transfers,
 )
-from app.utils import get_url_from_api, add_account_info_to_cache
+from app.utils import (
+    get_url_from_api,
+    add_account_info_to_cache,
+    api_client_config,
+    create_dict_for_tabulator_display_for_accounts,
+    create_dict_for_tabulator_display_for_blocks,
+    label_service,
+    live_updates,
+    scheduler_job_metrics,
+    worker_leader_election,
+    worker_snapshots,
+)
+from app.classes.api_trace import APITraceMiddleware
+from app.classes.latest_items import (
+    LatestItems,
+    block_hash,
+    block_height,
+    transaction_hash,
+    transaction_height,
+)
+from app.classes.live_updates import LiveStream
+from app.classes.address_store import AddressStore, open_address_store
+from app.classes.prerendered import PrerenderedFragment
+from app.classes.reference_data import REFERENCE_ROUTES, ReferenceData
+from app.classes.response_cache import TTLLRUCache
 import sentry_sdk
 import datetime as dt
-import httpx
-import pickle
+import os
+from pathlib import Path
 
 if environment["SITE_URL"] != "http://127.0.0.1:8000":
     sentry_sdk.init(
@@ -75,18 +111,66 @@ async def log_response(response):
 
 def read_addresses_if_available(app):
     print("Start getting addresses to indexes.")
-    app.addresses_to_indexes = {"mainnet": {}, "testnet": {}}
+    app.addresses_to_indexes = {"mainnet": AddressStore(), "testnet": AddressStore()}
     app.max_index_known = {"mainnet": 0, "testnet": 0}
-    try:
-        for net in ["mainnet", "testnet"]:
+    for net in ["mainnet", "testnet"]:
+        try:
             print(f"Start getting addresses to indexes for {net}.")
-            with open(
-                f"addresses/{net}_addresses_to_indexes.pickle", "rb"
-            ) as fp:  # Unpickling
-                app.addresses_to_indexes[net] = pickle.load(fp)
-                app.max_index_known[net] = max(app.addresses_to_indexes[net].values())
-    except Exception as error:
-        print(f"ERROR getting addresses: {error}")
+            app.addresses_to_indexes[net] = open_address_store(Path("addresses"), net)
+            app.max_index_known[net] = app.addresses_to_indexes[net].max_index
+        except Exception as error:
+            print(f"ERROR getting addresses for {net}: {error}")
+
+
+# app attributes the leader refreshes and publishes to the other workers.
+SNAPSHOTS = [
+    "blocks_cache",
+    "transactions_cache",
+    "home_fragments",
+    "decorated_transactions",
+    "transactions_count",
+    "decorated_smart_wallet_txs",
+    "accounts_cache",
+    "identity_providers_cache",
+    "consensus_cache",
+    "plt_cache",
+    "staking_pools_cache",
+    "staking_page",
+    "nodes_snapshot",
+    "reference_data",
+    "primed_suspended_cache",
+]
+
+
+def publish_snapshots(app: FastAPI, names: list[str]):
+    for name in names:
+        worker_snapshots.publish(name, getattr(app, name))
+
+
+def load_snapshots(app: FastAPI):
+    changed, history = worker_snapshots.read_if_changed("live_updates")
+    if changed:
+        live_updates.replay(history)
+    for name in SNAPSHOTS:
+        changed, value = worker_snapshots.read_if_changed(name)
+        if not changed:
+            continue
+        setattr(app, name, value)
+        if name == "accounts_cache":
+            for net in value:
+                add_new_accounts_to_cache(app, net)
+        if name == "reference_data":
+            label_service.refresh(value.labeled_accounts)
+
+
+def add_new_accounts_to_cache(app: FastAPI, net: str):
+    if not app.accounts_cache[net]:
+        return
+    for account_ in app.accounts_cache[net]:
+        account_info: CCD_AccountInfo = CCD_AccountInfo(**account_["account_info"])
+        if account_info.address[:29] not in app.addresses_to_indexes[net]:
+            print(f"Adding {account_info.index} to cache... FROM SCHEDULE")
+            add_account_info_to_cache(account_info, app, net)
 
 
 @asynccontextmanager
@@ -94,34 +178,36 @@ async def lifespan(app: FastAPI):
     # app.templates = Jinja2Templates(directory="app/templates")
     app.templates = templates
     app.api_url = environment["API_URL"]
-    app.httpx_client = httpx.AsyncClient(
-        # event_hooks={"request": [log_request], "response": [log_response]},
-        timeout=None,
+    # pool limits, timeouts and http2 are configured through API_* env variables.
+    app.httpx_client = api_client_config.create_client(
         headers={"x-ccdexplorer-key": environment["CCDEXPLORER_API_KEY"]},
     )
     app.env = environment
     app.tooter = tooter
-    app.credential_issuers = None
     app.env["API_KEY"] = str(uuid.uuid1())
     now = dt.datetime.now().astimezone(dt.timezone.utc)
-    app.labeled_accounts_last_requested = now - dt.timedelta(seconds=10)
     app.users_last_requested = now - dt.timedelta(seconds=10)
-    app.nodes_last_requested = now - dt.timedelta(seconds=10)
-    app.credential_issuers_last_requested = now - dt.timedelta(seconds=10)
-    app.consensus_last_requested = now - dt.timedelta(seconds=10)
-    app.staking_pools_last_requested = now - dt.timedelta(seconds=10)
-    app.exchange_rates_last_requested = now - dt.timedelta(seconds=10)
-    app.tags = None
-    app.nodes = None
     read_addresses_if_available(app)
-    app.schema_cache = {"mainnet": {}, "testnet": {}}
-    app.token_information_cache = {"mainnet": {}, "testnet": {}}
-    app.schema_cache = {"mainnet": {}, "testnet": {}}
-    app.cns_domain_cache = {"mainnet": {}, "testnet": {}}
-    app.blocks_cache = {"mainnet": [], "testnet": []}
-    app.transactions_cache = {"mainnet": [], "testnet": []}
+    # parsed schemas, the API responses themselves are cached in get_url_from_api.
+    app.schema_cache = TTLLRUCache(ttl=5, max_entries=200, max_bytes=32 * 1024 * 1024)
+    # the newest blocks and transactions, refreshed incrementally by the leader.
+    app.blocks_cache = {
+        net: LatestItems(LATEST_ITEMS_SIZE, block_height, block_hash) for net in NETS
+    }
+    app.transactions_cache = {
+        net: LatestItems(LATEST_ITEMS_SIZE, transaction_height, transaction_hash)
+        for net in NETS
+    }
     app.accounts_cache = {"mainnet": [], "testnet": []}
     app.identity_providers_cache = {"mainnet": {}, "testnet": {}}
+    # anonymous home page tables, rendered once per refresh.
+    app.home_fragments = {net: {} for net in NETS}
+    # listing rows decorated in the background, see routers/live_updates.py.
+    app.decorated_transactions = {net: [] for net in NETS}
+    app.decorated_smart_wallet_txs = {net: [] for net in NETS}
+    app.transactions_count = {}
+    # where the leader's SSE feeds for accounts and smart wallets are.
+    app.live_cursors = {net: {} for net in NETS}
     app.consensus_cache = {"mainnet": {}, "testnet": {}}
     app.plt_cache = {"mainnet": {}, "testnet": {}}
     app.primed_suspended_cache = {}
@@ -130,11 +216,22 @@ async def lifespan(app: FastAPI):
         "closed_for_new": {},
         "closed_for_all": {},
     }
-    await repeated_task_get_staking_pools(app)
-    await repeated_task_get_accounts_id_providers(app)
+    app.staking_page = {}
+    app.nodes_snapshot = {net: None for net in NETS}
+    app.reference_data = ReferenceData()
+    # only the leader talks to the API for the background caches, the other
+    # workers use the snapshots it publishes.
+    if worker_leader_election.try_acquire():
+        print(f"Worker {os.getpid()} is the scheduler leader.")
+        await repeated_task_get_reference_data(app)
+        await repeated_task_get_staking_pools(app)
+        await repeated_task_get_accounts_id_providers(app)
+    else:
+        load_snapshots(app)
     scheduler.start()
     yield
     scheduler.shutdown()
+    worker_leader_election.release()
     await app.httpx_client.aclose()
     print("END")
     pass
@@ -142,10 +239,11 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+# records the API calls of every request, see base/api-calls.html.
+app.add_middleware(APITraceMiddleware)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 app.mount("/node", StaticFiles(directory="node_modules"), name="node_modules")
-app.mount("/addresses", StaticFiles(directory="addresses"), name="addresses")
 
 
 @app.exception_handler(404)
@@ -193,6 +291,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(metrics.router)
+app.include_router(live_updates_router.router)
 app.include_router(home.router)
 app.include_router(transaction.router)
 app.include_router(block.router)
@@ -220,98 +320,455 @@ app.include_router(sc_holders.router)
 app.include_router(sc_plt_transfers.router)
 
 
-@scheduler.scheduled_job("interval", seconds=5, args=[app])
-async def repeated_task_get_blocks_and_transactions(app: FastAPI):
-    for net in ["mainnet", "testnet"]:
-        api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/blocks/last/50", app.httpx_client
-        )
-        app.blocks_cache[net] = api_result.return_value if api_result.ok else None
+# a run that is still going when the next one is due makes that one skip, a
+# backlog of missed runs (event loop was blocked) runs once.
+NON_OVERLAPPING = {"max_instances": 1, "coalesce": True}
+NETS = ["mainnet", "testnet"]
+CACHED_LAST = ["blocks", "transactions"]
+LATEST_ITEMS_SIZE = 50
+# smart wallet txs decorated in the background, for the first pages.
+DECORATED_SNAPSHOT_SIZE = 50
 
-        api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/transactions/last/50", app.httpx_client
-        )
-        app.transactions_cache[net] = api_result.return_value if api_result.ok else None
 
+def count_skipped_job(event: JobSubmissionEvent):
+    scheduler_job_metrics.skip(event.job_id)
 
-@scheduler.scheduled_job("interval", seconds=20, args=[app])
-async def repeated_task_get_consensus(app: FastAPI):
-    # for net in ["mainnet", "testnet"]:
-    for net in ["mainnet", "testnet"]:
+
+scheduler.add_listener(count_skipped_job, EVENT_JOB_MAX_INSTANCES)
+
+
+@scheduler.scheduled_job(
+    "interval", seconds=2, id="follow_leader", args=[app], **NON_OVERLAPPING
+)
+async def repeated_task_follow_leader(app: FastAPI):
+    if worker_leader_election.is_leader:
+        return
+    if worker_leader_election.try_acquire():
+        # the previous leader is gone, its last snapshots are what we have.
+        print(f"Worker {os.getpid()} took over as scheduler leader.")
+        return
+    load_snapshots(app)
+
+
+def prerender_home_fragments(app: FastAPI, net: str, tags: dict | None):
+    """The home page tables as anonymous visitors see them, gzipped."""
+    for name, latest, render in [
+        ("blocks", app.blocks_cache[net], render_last_blocks),
+        ("txs", app.transactions_cache[net], render_last_txs),
+    ]:
+        if len(latest) == 0:
+            continue
+        try:
+            html = render(app, net, latest.latest(10), tags, None)
+        except Exception as error:
+            print(f"ERROR rendering home {name} for {net}: {error}")
+            continue
+        app.home_fragments[net][name] = PrerenderedFragment(html)
+
+
+async def refresh_latest_items(
+    app: FastAPI, net: str, resource: str
+) -> list[dict] | None:
+    """Returns the new items, newest first, or None if the refresh failed."""
+    latest: LatestItems = getattr(app, f"{resource}_cache")[net]
+    previous_height = latest.newest_height
+    if previous_height is not None:
         api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/misc/consensus-detailed-status", app.httpx_client
+            f"{app.api_url}/v2/{net}/{resource}/newer/than/{previous_height}",
+            app.httpx_client,
         )
-        app.consensus_cache[net] = api_result.return_value if api_result.ok else None
         if not api_result.ok:
-            print(f"ERROR: {api_result.return_value}")
-
+            # keep the last good data, the staleness metric shows its age.
+            return None
+        if len(api_result.return_value or []) < latest.size:
+            return latest.add_newer(api_result.return_value or [])
+        # a buffer full (or more) of new items, there may be a gap. Start over.
 
-@scheduler.scheduled_job("interval", seconds=60, args=[app])
-async def repeated_task_get_accounts_id_providers(app: FastAPI):
-    for net in ["mainnet", "testnet"]:
-        api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/accounts/last/50", app.httpx_client
+    api_result = await get_url_from_api(
+        f"{app.api_url}/v2/{net}/{resource}/last/{latest.size}", app.httpx_client
+    )
+    if not api_result.ok:
+        return None
+    latest.replace(api_result.return_value or [])
+    return latest.newer_than(previous_height) if previous_height is not None else []
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=5,
+    jitter=1,
+    id="blocks_and_transactions",
+    args=[app],
+    **NON_OVERLAPPING,
+)
+async def repeated_task_get_blocks_and_transactions(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("blocks_and_transactions") as run:
+        resources = [(net, resource) for net in NETS for resource in CACHED_LAST]
+        *results, mainnet_count, testnet_count = await asyncio.gather(
+            *[refresh_latest_items(app, net, resource) for net, resource in resources],
+            *[
+                get_url_from_api(
+                    f"{app.api_url}/v2/{net}/transactions/info/count",
+                    app.httpx_client,
+                )
+                for net in NETS
+            ],
+        )
+        run.ok = all(result is not None for result in results)
+        for net, api_result in zip(NETS, [mainnet_count, testnet_count]):
+            if api_result.ok:
+                app.transactions_count[net] = api_result.return_value
+        tags = await get_community_labels(app)
+        for net in NETS:
+            prerender_home_fragments(app, net, tags)
+            await decorate_latest_transactions(app, net, tags)
+        publish_snapshots(
+            app,
+            [
+                "blocks_cache",
+                "transactions_cache",
+                "home_fragments",
+                "decorated_transactions",
+                "transactions_count",
+            ],
         )
-        app.accounts_cache[net] = api_result.return_value if api_result.ok else None
 
-        identity_providers = {}
+        # new rows for the SSE subscribers, decorated once for all of them.
+        new_items = dict(zip(resources, results))
+        for net in NETS:
+            live_updates.publish(
+                net,
+                LiveStream.blocks,
+                [
+                    create_dict_for_tabulator_display_for_blocks(net, x)
+                    for x in new_items[(net, "blocks")] or []
+                ],
+            )
+            new_hashes = {x["hash"] for x in new_items[(net, "transactions")] or []}
+            live_updates.publish(
+                net,
+                LiveStream.transactions,
+                [
+                    row
+                    for row in app.decorated_transactions[net]
+                    if row["hash_download"] in new_hashes
+                ],
+            )
+        worker_snapshots.publish("live_updates", live_updates.history)
+
+
+async def refresh_live_accounts(app: FastAPI, net: str) -> bool:
+    cursor = app.live_cursors[net].get("accounts")
+    if cursor is None:
         api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/misc/identity-providers",
+            f"{app.api_url}/v2/{net}/accounts/paginated/skip/0/limit/1",
             app.httpx_client,
         )
-        for id in api_result.return_value:
-            id = CCD_IpInfo(**id)
-            identity_providers[str(id.identity)] = {
-                "ip_identity": id.identity,
-                "ip_description": id.description.name,
-            }
-
-        app.identity_providers_cache[net] = (
-            identity_providers if api_result.ok else None
+        accounts = (
+            (api_result.return_value or {}).get("accounts") if api_result.ok else None
         )
-        if app.accounts_cache[net]:
-            for account_ in app.accounts_cache[net]:
-                account_info: CCD_AccountInfo = CCD_AccountInfo(
-                    **account_["account_info"]
-                )
-                if account_info.address[:29] not in app.addresses_to_indexes[net]:
-                    print(f"Adding {account_info.index} to cache... FROM SCHEDULE")
-                    add_account_info_to_cache(account_info, app, net)
+        if accounts:
+            app.live_cursors[net]["accounts"] = accounts[0]["account_index"]
+        return api_result.ok
 
-        api_result = await get_url_from_api(
-            f"{app.api_url}/v2/{net}/plts/overview", app.httpx_client
+    api_result = await get_url_from_api(
+        f"{app.api_url}/v2/{net}/accounts/newer/than/{cursor}", app.httpx_client
+    )
+    if not api_result.ok:
+        return False
+    accounts = sorted(
+        api_result.return_value or [], key=lambda x: x["account_index"], reverse=True
+    )
+    if accounts:
+        app.live_cursors[net]["accounts"] = accounts[0]["account_index"]
+        live_updates.publish(
+            net,
+            LiveStream.accounts,
+            [
+                create_dict_for_tabulator_display_for_accounts(net, app, x)
+                for x in accounts
+            ],
         )
-        app.plt_cache[net] = api_result.return_value if api_result.ok else None
-        if not api_result.ok:
-            print(f"ERROR: {api_result.return_value}")
+    return True
+
+
+async def refresh_live_smart_wallets(app: FastAPI, net: str) -> bool:
+    cursor = app.live_cursors[net].get("smart_wallets")
+    if cursor is None:
+        url = f"{app.api_url}/v2/{net}/smart-wallets/transactions/paginated/skip/0/limit/{DECORATED_SNAPSHOT_SIZE}"
+    else:
+        url = f"{app.api_url}/v2/{net}/smart-wallets/transactions/newer/than/{cursor}"
+    api_result = await get_url_from_api(url, app.httpx_client)
+    if not api_result.ok:
+        return False
+    smart_wallet_txs = sorted(
+        (api_result.return_value or {}).values(),
+        key=lambda x: transaction_height(x["tx"]),
+        reverse=True,
+    )
+    if smart_wallet_txs:
+        app.live_cursors[net]["smart_wallets"] = transaction_height(
+            smart_wallet_txs[0]["tx"]
+        )
+    elif cursor is None:
+        # none at all yet, start at the newest block we know of.
+        app.live_cursors[net]["smart_wallets"] = app.transactions_cache[
+            net
+        ].newest_height
+    if not smart_wallet_txs:
+        return True
+
+    tags = await get_community_labels(app)
+    rows = await decorate_smart_wallet_transactions(app, net, smart_wallet_txs, tags)
+    app.decorated_smart_wallet_txs[net] = (rows + app.decorated_smart_wallet_txs[net])[
+        :DECORATED_SNAPSHOT_SIZE
+    ]
+    if cursor is not None:
+        live_updates.publish(net, LiveStream.smart_wallets, rows)
+    return True
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=10,
+    jitter=1,
+    id="live_accounts_smart_wallets",
+    args=[app],
+    **NON_OVERLAPPING,
+)
+async def repeated_task_get_live_accounts_smart_wallets(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("live_accounts_smart_wallets") as run:
+        results = await asyncio.gather(
+            *[refresh_live_accounts(app, net) for net in NETS],
+            *[refresh_live_smart_wallets(app, net) for net in NETS],
+        )
+        run.ok = all(results)
+        publish_snapshots(app, ["decorated_smart_wallet_txs"])
+        worker_snapshots.publish("live_updates", live_updates.history)
 
 
-@scheduler.scheduled_job("interval", seconds=5 * 60, args=[app])
-async def repeated_task_get_staking_pools(app: FastAPI):
-    print("Staking pools cache + primed suspended cache...")
-
-    temp_dict = {}
-    for status in ["open_for_all", "closed_for_new", "closed_for_all"]:
-        api_result = await get_url_from_api(
-            f"{app.api_url}/v2/mainnet/accounts/paydays/pools/{status}",
+@scheduler.scheduled_job(
+    "interval", seconds=20, jitter=2, id="consensus", args=[app], **NON_OVERLAPPING
+)
+async def repeated_task_get_consensus(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("consensus") as run:
+        results = await asyncio.gather(
+            *[
+                get_url_from_api(
+                    f"{app.api_url}/v2/{net}/misc/consensus-detailed-status",
+                    app.httpx_client,
+                )
+                for net in NETS
+            ]
+        )
+        for net, api_result in zip(NETS, results):
+            app.consensus_cache[net] = (
+                api_result.return_value if api_result.ok else None
+            )
+            run.ok &= api_result.ok
+            if not api_result.ok:
+                print(f"ERROR: {api_result.return_value}")
+        publish_snapshots(app, ["consensus_cache"])
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=10,
+    jitter=1,
+    id="reference_data",
+    args=[app],
+    **NON_OVERLAPPING,
+)
+async def repeated_task_get_reference_data(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("reference_data") as run:
+        fields = list(REFERENCE_ROUTES)
+        results = await asyncio.gather(
+            *[
+                get_url_from_api(
+                    f"{app.api_url}{REFERENCE_ROUTES[field]}", app.httpx_client
+                )
+                for field in fields
+            ],
+            *[
+                get_url_from_api(f"{app.api_url}/v2/{net}/misc/nodes", app.httpx_client)
+                for net in NETS
+            ],
+        )
+        previous: ReferenceData = app.reference_data
+        # whatever couldn't be fetched stays as it was.
+        values = {}
+        for field, api_result in zip(fields, results):
+            values[field] = (
+                api_result.return_value if api_result.ok else getattr(previous, field)
+            )
+            run.ok &= api_result.ok
+        nodes = {}
+        for net, api_result in zip(NETS, results[len(fields) :]):
+            nodes[net] = (
+                api_result.return_value
+                if api_result.ok
+                else (previous.nodes or {}).get(net)
+            )
+            run.ok &= api_result.ok
+
+        reference_data = ReferenceData(**values, nodes=nodes)
+        if reference_data != previous:
+            app.reference_data = reference_data
+            label_service.refresh(reference_data.labeled_accounts)
+            publish_snapshots(app, ["reference_data"])
+
+
+async def get_nodes_for_net(app: FastAPI, net: str) -> bool:
+    nodes_result, payday_result = await asyncio.gather(
+        get_url_from_api(
+            f"{app.api_url}/v2/{net}/accounts/nodes-validators", app.httpx_client
+        ),
+        get_url_from_api(
+            f"{app.api_url}/v2/{net}/accounts/last-payday-block/info",
             app.httpx_client,
+        ),
+    )
+    # keeps the previous snapshot if the nodes can't be fetched.
+    if nodes_result.ok:
+        app.nodes_snapshot[net] = build_nodes_snapshot(
+            nodes_result.return_value,
+            payday_result.return_value if payday_result.ok else None,
         )
+    return nodes_result.ok and payday_result.ok
 
-        temp_dict[status] = api_result.return_value if api_result.ok else {}
 
-    all_pool_with_status = []
-    for status in ["open_for_all", "closed_for_all", "closed_for_new"]:
-        for pool_id, pool in temp_dict.get(status, {}).items():  # use [] if it's a list
-            pool_with_status = {**pool, "status": status}
-            all_pool_with_status.append(pool_with_status)
+@scheduler.scheduled_job(
+    "interval", seconds=60, jitter=5, id="nodes", args=[app], **NON_OVERLAPPING
+)
+async def repeated_task_get_nodes(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("nodes") as run:
+        results = await asyncio.gather(*[get_nodes_for_net(app, net) for net in NETS])
+        run.ok = all(results)
+        publish_snapshots(app, ["nodes_snapshot"])
+
+
+async def get_accounts_id_providers_for_net(app: FastAPI, net: str) -> bool:
+    accounts_result, id_providers_result, plts_result = await asyncio.gather(
+        get_url_from_api(f"{app.api_url}/v2/{net}/accounts/last/50", app.httpx_client),
+        get_url_from_api(
+            f"{app.api_url}/v2/{net}/misc/identity-providers",
+            app.httpx_client,
+        ),
+        get_url_from_api(f"{app.api_url}/v2/{net}/plts/overview", app.httpx_client),
+    )
+    app.accounts_cache[net] = (
+        accounts_result.return_value if accounts_result.ok else None
+    )
 
-    app.staking_pools_cache = all_pool_with_status
+    identity_providers = {}
+    for id in id_providers_result.return_value if id_providers_result.ok else []:
+        id = CCD_IpInfo(**id)
+        identity_providers[str(id.identity)] = {
+            "ip_identity": id.identity,
+            "ip_description": id.description.name,
+        }
 
-    api_result = await get_url_from_api(
-        f"{app.api_url}/v2/mainnet/accounts/validators/primed-suspended",
-        app.httpx_client,
+    app.identity_providers_cache[net] = (
+        identity_providers if id_providers_result.ok else None
     )
-    app.primed_suspended_cache = api_result.return_value if api_result.ok else {}
+    add_new_accounts_to_cache(app, net)
+
+    app.plt_cache[net] = plts_result.return_value if plts_result.ok else None
+    if not plts_result.ok:
+        print(f"ERROR: {plts_result.return_value}")
+    return accounts_result.ok and id_providers_result.ok and plts_result.ok
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=60,
+    jitter=5,
+    id="accounts_id_providers",
+    args=[app],
+    **NON_OVERLAPPING,
+)
+async def repeated_task_get_accounts_id_providers(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    with scheduler_job_metrics.timed("accounts_id_providers") as run:
+        results = await asyncio.gather(
+            *[get_accounts_id_providers_for_net(app, net) for net in NETS]
+        )
+        run.ok = all(results)
+        publish_snapshots(
+            app, ["accounts_cache", "identity_providers_cache", "plt_cache"]
+        )
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=5 * 60,
+    jitter=15,
+    id="staking_pools",
+    args=[app],
+    **NON_OVERLAPPING,
+)
+async def repeated_task_get_staking_pools(app: FastAPI):
+    if not worker_leader_election.is_leader:
+        return
+    print("Staking pools cache + primed suspended cache...")
+
+    statuses = ["open_for_all", "closed_for_new", "closed_for_all"]
+    with scheduler_job_metrics.timed("staking_pools") as run:
+        *pool_results, api_result, passive_result = await asyncio.gather(
+            *[
+                get_url_from_api(
+                    f"{app.api_url}/v2/mainnet/accounts/paydays/pools/{status}",
+                    app.httpx_client,
+                )
+                for status in statuses
+            ],
+            get_url_from_api(
+                f"{app.api_url}/v2/mainnet/accounts/validators/primed-suspended",
+                app.httpx_client,
+            ),
+            get_url_from_api(
+                f"{app.api_url}/v2/mainnet/account/passive_delegation/staking-rewards-object/passive_delegation",
+                app.httpx_client,
+            ),
+        )
+
+        temp_dict = {}
+        for status, pool_result in zip(statuses, pool_results):
+            temp_dict[status] = pool_result.return_value if pool_result.ok else {}
+            run.ok &= pool_result.ok
+
+        all_pool_with_status = []
+        for status in ["open_for_all", "closed_for_all", "closed_for_new"]:
+            # use [] if it's a list
+            for pool_id, pool in temp_dict.get(status, {}).items():
+                pool_with_status = {**pool, "status": status}
+                all_pool_with_status.append(pool_with_status)
+
+        app.staking_pools_cache = all_pool_with_status
+
+        app.primed_suspended_cache = api_result.return_value if api_result.ok else {}
+        run.ok &= api_result.ok
+        account_apy_object = (
+            passive_result.return_value
+            if passive_result.ok
+            else app.staking_page.get("account_apy_object")
+        )
+        run.ok &= passive_result.ok
+        app.staking_page = build_staking_page(app, account_apy_object)
+        publish_snapshots(
+            app, ["staking_pools_cache", "primed_suspended_cache", "staking_page"]
+        )
 
     print("Staking pools cache + primed suspended cache updated.")
 
@@ -26,11 +26,13 @@ from app.classes.dressingroom import (
     MakeUpRequest,
     RequestingRoute,
 )
+from app.classes.page_plan import PageDataPlan
 from app.classes.sankey import SanKey
 from app.env import environment
 from app.jinja2_helpers import templates
 from app.state import get_httpx_client, get_labeled_accounts, get_user_detailsv2
 from app.utils import (
+    APIStreamError,
     PaginationRequest,
     account_link,
     add_account_info_to_cache,
@@ -39,6 +41,7 @@ from app.utils import (
     from_address_to_index,
     get_url_from_api,
     pagination_calculator,
+    stream_url_from_api,
     tx_type_translation_for_js,
     create_dict_for_tabulator_display,
     create_dict_for_tabulator_display_for_rewards,
@@ -417,16 +420,152 @@ async def get_account(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     if "hx-request" in request.headers:
         print("hx-request", request.headers["hx-request"])
-    user: UserV2 | None = await get_user_detailsv2(request)
 
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{index_or_hash}/info",
-        httpx_client,
+    async def api_value(url: str, default=None):
+        api_result = await get_url_from_api(f"{request.app.api_url}{url}", httpx_client)
+        return api_result.return_value if api_result.ok else default
+
+    async def fetch_user():
+        return await get_user_detailsv2(request)
+
+    async def fetch_account_info():
+        info = await api_value(f"/v2/{net}/account/{index_or_hash}/info")
+        return CCD_AccountInfo(**info) if info else None
+
+    async def fetch_tx_types():
+        return await api_value(f"/v2/{net}/transaction_types")
+
+    async def fetch_account_apy_object(account_info: CCD_AccountInfo):
+        if not (account_info.stake and account_info.stake.delegator):
+            return None
+        target = account_info.stake.delegator.target
+        if target.baker:
+            url = f"/v2/{net}/account/{target.baker}/staking-rewards-object/delegator"
+        else:
+            # passive_delegation
+            url = f"/v2/{net}/account/passive_delegation/staking-rewards-object/passive_delegation"
+        return await api_value(url)
+
+    def validator_id_for(account_info: CCD_AccountInfo):
+        if account_info.stake and account_info.stake.baker:
+            return account_info.stake.baker.baker_info.baker_id
+        return None
+
+    async def fetch_pool(account_info: CCD_AccountInfo):
+        validator_id = validator_id_for(account_info)
+        if validator_id is None:
+            return None
+        return await api_value(f"/v2/{net}/account/{validator_id}/pool-info")
+
+    async def fetch_pool_apy_object(account_info: CCD_AccountInfo):
+        validator_id = validator_id_for(account_info)
+        if validator_id is None:
+            return None
+        return await api_value(
+            f"/v2/{net}/account/{validator_id}/staking-rewards-object/delegator"
+        )
+
+    async def fetch_rewards_available(account_info: CCD_AccountInfo):
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/rewards-available"
+        )
+
+    async def fetch_tokens_available(account_info: CCD_AccountInfo):
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/tokens-available"
+        )
+
+    async def fetch_tokens_value_USD(
+        account_info: CCD_AccountInfo, tokens_available: bool
+    ):
+        if not tokens_available:
+            return 0
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/fungible-tokens/USD", 0
+        )
+
+    async def fetch_plts_value_USD(
+        account_info: CCD_AccountInfo, tokens_available: bool
+    ):
+        if not tokens_available:
+            return 0
+        return await api_value(f"/v2/{net}/account/{account_info.address}/plt/USD", 0)
+
+    async def fetch_ccd_balance_USD(account_info: CCD_AccountInfo):
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/balance/USD", 0
+        )
+
+    async def fetch_cis2_token_ids(account_info: CCD_AccountInfo):
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/token-symbols-for-flow", []
+        )
+
+    async def fetch_plt_ids(account_info: CCD_AccountInfo):
+        return await api_value(
+            f"/v2/{net}/account/{account_info.address}/plt-symbols-for-flow", []
+        )
+
+    async def fetch_deployed(account_info: CCD_AccountInfo):
+        api_result = await get_url_from_api(
+            f"{request.app.api_url}/v2/{net}/account/{account_info.address}/deployed",
+            httpx_client,
+        )
+        if (api_result.ok) and (api_result.return_value is None):
+            # this account was created in the genesis block!
+            genesis_block = await api_value(f"/v2/{net}/block/0")
+            return {
+                "deployed_in_genesis_block": True,
+                "tx_deployed": None,
+                "genesis_block_slot_time": (
+                    CCD_BlockInfo(**genesis_block).slot_time
+                    if genesis_block
+                    else dt.datetime.now().astimezone(dt.UTC)
+                ),
+            }
+        return {
+            "deployed_in_genesis_block": False,
+            "tx_deployed": (
+                CCD_BlockItemSummary(**api_result.return_value)
+                if api_result.ok
+                else None
+            ),
+            "genesis_block_slot_time": None,
+        }
+
+    # Everything but the token USD values only needs the account info, so the
+    # page is built in (at most) three round trips instead of one per call.
+    plan = PageDataPlan()
+    plan.add("user", fetch_user)
+    plan.add("account_info", fetch_account_info)
+    plan.add("tx_types", fetch_tx_types)
+    plan.add("account_apy_object", fetch_account_apy_object, ["account_info"])
+    plan.add("pool", fetch_pool, ["account_info"])
+    plan.add("pool_apy_object", fetch_pool_apy_object, ["account_info"])
+    plan.add("rewards_available", fetch_rewards_available, ["account_info"])
+    plan.add("tokens_available", fetch_tokens_available, ["account_info"])
+    plan.add(
+        "tokens_value_USD",
+        fetch_tokens_value_USD,
+        ["account_info", "tokens_available"],
+        skip_if_missing=False,
     )
-    account_info = CCD_AccountInfo(**api_result.return_value) if api_result.ok else None  # type: ignore
+    plan.add(
+        "plts_value_USD",
+        fetch_plts_value_USD,
+        ["account_info", "tokens_available"],
+        skip_if_missing=False,
+    )
+    plan.add("ccd_balance_USD", fetch_ccd_balance_USD, ["account_info"])
+    plan.add("cis2_token_ids", fetch_cis2_token_ids, ["account_info"])
+    plan.add("plt_ids", fetch_plt_ids, ["account_info"])
+    plan.add("deployed", fetch_deployed, ["account_info"])
+    page_data = await plan.run()
+
+    user: UserV2 | None = page_data["user"]
+    account_info: CCD_AccountInfo | None = page_data["account_info"]
     if not account_info:
         api_result = await get_url_from_api(
             f"{request.app.api_url}/v2/{net}/smart-wallet/public-key/{index_or_hash}",
@@ -460,246 +599,43 @@ async def get_account(
     account_id = account_info.address
     account_index = account_info.index
 
-    if account_info.stake:
-        delegation = account_info.stake.delegator
-        validator_id = (
-            account_info.stake.baker.baker_info.baker_id
-            if account_info.stake.baker
-            else None
-        )
-    else:
-        delegation = None
-        validator_id = None
-
+    delegation = account_info.stake.delegator if account_info.stake else None
+    account_is_validator = validator_id_for(account_info) is not None
     identity = Identity(account_info)
 
     account_link_found = account_link(account_id, net, user, tags, request.app)
 
-    delegation_target_address = None
-    account_apy_object = None
-    if delegation:
-        delegation_target_address = delegation.target
-        if delegation_target_address.baker:
-            api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/account/{delegation_target_address.baker}/staking-rewards-object/delegator",
-                httpx_client,
-            )
-        else:
-            # passive_delegation
-            api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/account/passive_delegation/staking-rewards-object/passive_delegation",
-                httpx_client,
-            )
-        account_apy_object = api_result.return_value if api_result.ok else None
-
-    if validator_id is not None:
-        account_is_validator = True
-
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{validator_id}/pool-info",
-            httpx_client,
-        )
-        pool = api_result.return_value if api_result.ok else None
-
-        # api_result = await get_url_from_api(
-        #     f"{request.app.api_url}/v2/{net}/account/{account_index}/node", httpx_client
-        # )
-        # node = api_result.return_value if api_result.ok else None
-
-        # api_result = await get_url_from_api(
-        #     f"{request.app.api_url}/v2/{net}/account/{validator_id}/earliest-win-time",
-        #     httpx_client,
-        # )
-        # earliest_win_time = api_result.return_value if api_result.ok else None
-
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{validator_id}/staking-rewards-object/delegator",
-            httpx_client,
-        )
-        pool_apy_object = api_result.return_value if api_result.ok else None
-
-        # api_result = await get_url_from_api(
-        #     f"{request.app.api_url}/v2/{net}/account/{account_id}/staking-rewards-object/account",
-        #     httpx_client,
-        # )
-        # account_apy_object = api_result.return_value if api_result.ok else None
-
-    else:
-
-        account_is_validator = False
-        pool = None
-        node = None
-        pool_apy_object = None
-        earliest_win_time = None
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/rewards-available",
-        httpx_client,
-    )
-    rewards_for_account_available = api_result.return_value if api_result.ok else None
+    delegation_target_address = delegation.target if delegation else None
+    account_apy_object = page_data["account_apy_object"]
+    pool = page_data["pool"]
+    pool_apy_object = page_data["pool_apy_object"]
+    rewards_for_account_available = page_data["rewards_available"]
 
     if pool_apy_object or account_apy_object or rewards_for_account_available:
         rewards_filename = f"/tmp/staking_rewards - {account_id} - {dt.datetime.now().strftime("%Y-%m")}.csv"
     else:
         rewards_filename = None
 
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/tokens-available",
-        httpx_client,
-    )
-    tokens_available = api_result.return_value if api_result.ok else None
-
-    tokens_value_USD = 0
-    if tokens_available:
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{account_id}/fungible-tokens/USD",
-            httpx_client,
-        )
-        tokens_value_USD = api_result.return_value if api_result.ok else 0
+    tokens_available = page_data["tokens_available"]
+    tokens_value_USD = page_data["tokens_value_USD"]
     assert isinstance(tokens_value_USD, (int, float))
-
-    plts_value_USD = 0
-    if tokens_available:
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{account_id}/plt/USD",
-            httpx_client,
-        )
-        plts_value_USD = api_result.return_value if api_result.ok else 0
+    plts_value_USD = page_data["plts_value_USD"]
     assert isinstance(plts_value_USD, (int, float))
     tokens_value_USD += plts_value_USD
 
-    ccd_balance_USD = 0
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/balance/USD",
-        httpx_client,
-    )
-    ccd_balance_USD = api_result.return_value if api_result.ok else 0
+    ccd_balance_USD = page_data["ccd_balance_USD"]
 
     # TODO
     cns_domains_list = None  # cns_domains_registered(account_id)
 
-    cis2_token_ids = []
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/token-symbols-for-flow",
-        httpx_client,
-    )
-    cis2_token_ids = api_result.return_value if api_result.ok else []
-
-    plt_ids = []
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/plt-symbols-for-flow",
-        httpx_client,
-    )
-    plt_ids = api_result.return_value if api_result.ok else []
-    token_ids = cis2_token_ids + plt_ids  # type: ignore
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/{account_id}/deployed",
-        httpx_client,
-    )
+    token_ids = page_data["cis2_token_ids"] + page_data["plt_ids"]  # type: ignore
 
-    deployed_in_genesis_block = False
-    genesis_block_slot_time = None
-    if (api_result.ok) and (api_result.return_value is None):
-        # this account was created in the genesis block!
-        deployed_in_genesis_block = True
-        tx_deployed = None
-        api_result = api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/block/0",
-            httpx_client,
-        )
-        genesis_block_slot_time = (
-            CCD_BlockInfo(**api_result.return_value).slot_time
-            if api_result.ok
-            else dt.datetime.now().astimezone(dt.UTC)
-        )
-    else:
-        tx_deployed = (
-            CCD_BlockItemSummary(**api_result.return_value) if api_result.ok else None
-        )
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/transaction_types", httpx_client
-    )
-    tx_types = api_result.return_value if api_result.ok else None
-
-    request.state.api_calls["Account Info"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_info_v2__net__account__index_or_hash__info_get"
-    )
-    request.state.api_calls["Identity Providers"] = (
-        f"{request.app.api_url}/docs#/Misc/get_identity_providers_v2__net__misc_identity_providers_get"
-    )
-    request.state.api_calls["Account Transactions"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_txs_v2__net__account__account_id__transactions__skip___limit__get"
-    )
-    request.state.api_calls["Rewards Available"] = (
-        f"{request.app.api_url}/docs#/Account/get_bool_account_rewards_available_v2__net__account__account_id__rewards_available_get"
-    )
-    request.state.api_calls["APY Data"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_apy_data_v2__net__account__index_or_hash__apy_data_get"
-    )
-    request.state.api_calls["Tokens Available"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_tokens_available_v2__net__account__account_address__tokens_available_get"
-    )
-    request.state.api_calls["CCD Balance in USD"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_balance_in_USD_v2__net__account__account_address__balance_USD_get"
-    )
-    request.state.api_calls["Token Symbols for Flow"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_token_symbols_for_flow_v2__net__account__account_address__token_symbols_for_flow_get"
-    )
-    request.state.api_calls["Verified Fungible Tokens"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_fungible_tokens_verified_v2__net__account__account_address__fungible_tokens__skip___limit__verified_get"
-    )
-    request.state.api_calls["Verified Non-Fungible Tokens"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_non_fungible_tokens_verified_v2__net__account__account_address__non_fungible_tokens__skip___limit__verified_get"
-    )
-    request.state.api_calls["Unverified Tokens"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_tokens_unverified_v2__net__account__account_address__tokens__skip___limit__unverified_get"
-    )
-    request.state.api_calls["Aliases in Use"] = (
-        f"{request.app.api_url}/docs#/Account/get_aliases_in_use_for_account_v2__net__account__account_address__aliases_in_use_get"
-    )
-    request.state.api_calls["Deployed Tx"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_deployment_tx_v2__net__account__account_id__deployed_get"
-    )
-    request.state.api_calls["Transactions for Flow"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_transactions_for_flow_graph_v2__net__account__account_id__transactions_for_flow__gte___start_date___end_date__get"
-    )
-    request.state.api_calls["Rewards for Flow"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_rewards_for_flow_graph_v2__net__account__account_id__rewards_for_flow__start_date___end_date__get"
-    )
-    request.state.api_calls["Pool Info"] = (
-        f"{request.app.api_url}/docs#/Account/get_validator_pool_info_v2__net__account__index__pool_info_get"
-    )
-    request.state.api_calls["Node"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_validator_node_v2__net__account__index__node_get"
-    )
-    request.state.api_calls["Earliest Win Time"] = (
-        f"{request.app.api_url}/docs#/Account/get_validator_earliest_win_time_v2__net__account__index__earliest_win_time_get"
-    )
-    request.state.api_calls["Current Payday Stats"] = (
-        f"{request.app.api_url}/docs#/Account/get_validator_current_payday_stats_v2__net__account__index__current_payday_stats_get"
-    )
-    request.state.api_calls["Validator/Account Staking Rewards"] = (
-        f"{request.app.api_url}/docs#/Account/get_staking_rewards_object_v2__net__account__index_or_hash__staking_rewards_object_get"
-    )
+    deployed_in_genesis_block = page_data["deployed"]["deployed_in_genesis_block"]
+    tx_deployed = page_data["deployed"]["tx_deployed"]
+    genesis_block_slot_time = page_data["deployed"]["genesis_block_slot_time"]
 
-    request.state.api_calls["Pool Delegators"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_pool_delegators_v2__net__account__index__pool_delegators__skip___limit__get"
-    )
-    request.state.api_calls["Validator Tally"] = (
-        f"{request.app.api_url}/docs#/Account/get_validator_tally_v2__net__account__index__validator_tally__skip___limit__get"
-    )
-    request.state.api_calls["Validator Transactions"] = (
-        f"{request.app.api_url}/docs#/Account/get_account_validator_txs_v2__net__account__account_id__validator_transactions__skip___limit__get"
-    )
+    tx_types = page_data["tx_types"]
 
-    request.state.api_calls["Staking Rewards"] = (
-        f"{request.app.api_url}/docs#/Account/get_staking_rewards_bucketed_v2__net__account__account_id__staking_rewards_bucketed_get"
-    )
-    request.state.api_calls["Validator Performance"] = (
-        f"{request.app.api_url}/docs#/Account/get_validator_performance_v2__net__account__index__validator_performance_get"
-    )
     # TODO
     exchange_rates = {"CCD": {"rate": 1}}
     return templates.TemplateResponse(
@@ -776,73 +712,77 @@ async def request_sankey(
         gte = int(gte.replace(",", "").replace(".", ""))
 
     sankey = SanKey(account_id, gte, request.app, net, token)
-    if token == "CCD":
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{account_id}/transactions-for-flow/{gte}/{start_date}/{end_date}",
-            httpx_client,
-        )
-        txs_for_account = api_result.return_value if api_result.ok else []
-
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/account/{account_id}/rewards-for-flow/{start_date}/{end_date}",
-            httpx_client,
-        )
-        account_rewards_total = api_result.return_value if api_result.ok else 0
+    try:
+        if token == "CCD":
+            # the flows are aggregated while the transactions stream in.
+            txs_for_account = stream_url_from_api(
+                f"{request.app.api_url}/v2/{net}/account/{account_id}/transactions-for-flow/{gte}/{start_date}/{end_date}",
+                httpx_client,
+            )
 
-        sankey.add_txs_for_account(
-            txs_for_account, account_rewards_total  # , exchange_rates
-        )
-    else:
-        # tokens
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/plt/{token}/info",
-            httpx_client,
-        )
-        plt_info = api_result.return_value if api_result.ok else None
-        if plt_info:
-            # PLT
             api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/account/{account_id}/plt-transactions-for-flow/{token}/{gte}/{start_date}/{end_date}",
+                f"{request.app.api_url}/v2/{net}/account/{account_id}/rewards-for-flow/{start_date}/{end_date}",
                 httpx_client,
             )
-            txs_for_account = api_result.return_value if api_result.ok else []
+            account_rewards_total = api_result.return_value if api_result.ok else 0
 
-            sankey.add_plt_txs_for_account(
-                txs_for_account,
-                plt_info["token_state"]["module_state"]["governance_account"][
-                    "account"
-                ],
+            await sankey.add_txs_for_account(
+                txs_for_account, account_rewards_total  # , exchange_rates
             )
         else:
-            # CIS-2
+            # tokens
             api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/token/{token}/info",
+                f"{request.app.api_url}/v2/{net}/plt/{token}/info",
                 httpx_client,
             )
-            token_tag = (
-                MongoTypeTokensTag(**api_result.return_value) if api_result.ok else None
-            )
-            if not token_tag:
-                return None
+            plt_info = api_result.return_value if api_result.ok else None
+            if plt_info:
+                # PLT
+                txs_for_account = stream_url_from_api(
+                    f"{request.app.api_url}/v2/{net}/account/{account_id}/plt-transactions-for-flow/{token}/{gte}/{start_date}/{end_date}",
+                    httpx_client,
+                )
 
-            token_id = (
-                f"{token_tag.contracts[0]}-"
-                if token != "CCDOGE"
-                else f"{token_tag.contracts[0]}-01"
-            )
+                await sankey.add_plt_txs_for_account(
+                    txs_for_account,
+                    plt_info["token_state"]["module_state"]["governance_account"][
+                        "account"
+                    ],
+                )
+            else:
+                # CIS-2
+                api_result = await get_url_from_api(
+                    f"{request.app.api_url}/v2/{net}/token/{token}/info",
+                    httpx_client,
+                )
+                token_tag = (
+                    MongoTypeTokensTag(**api_result.return_value)
+                    if api_result.ok
+                    else None
+                )
+                if not token_tag:
+                    return None
 
-            decimals = token_tag.decimals
-            display_name = token_tag.display_name
+                token_id = (
+                    f"{token_tag.contracts[0]}-"
+                    if token != "CCDOGE"
+                    else f"{token_tag.contracts[0]}-01"
+                )
 
-            api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/account/{account_id}/token-transactions-for-flow/{token_id}/{gte}/{start_date}/{end_date}",
-                httpx_client,
-            )
-            txs_for_account = api_result.return_value if api_result.ok else []
+                decimals = token_tag.decimals
+                display_name = token_tag.display_name
 
-            sankey.add_txs_for_account_for_token(
-                txs_for_account, decimals, display_name
-            )
+                txs_for_account = stream_url_from_api(
+                    f"{request.app.api_url}/v2/{net}/account/{account_id}/token-transactions-for-flow/{token_id}/{gte}/{start_date}/{end_date}",
+                    httpx_client,
+                )
+
+                await sankey.add_txs_for_account_for_token(
+                    txs_for_account, decimals, display_name
+                )
+    except APIStreamError:
+        # the flows would be based on part of the transactions.
+        return "Error getting the transactions for the flow diagram, please try again later."
 
     account_ids_to_lookup = {
         x[:29]: from_address_to_index(x[:29], net, request.app)
@@ -1119,7 +1059,6 @@ async def get_account_tx_sent_latest_first(
     account_address: str,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{account_address}/transactions/sent/latest_first",
         httpx_client,
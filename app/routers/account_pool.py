@@ -147,7 +147,6 @@ async def get_account_payday_stats(
     index: int,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{index}/current-payday-stats",
         httpx_client,
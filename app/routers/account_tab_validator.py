@@ -268,7 +268,6 @@ async def get_account_earliest(
     index: int,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{index}/earliest-win-time",
         httpx_client,
@@ -303,7 +302,6 @@ async def get_account_aliases_in_use(
     account_address: str,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{account_address}/aliases-in-use",
         httpx_client,
@@ -333,7 +331,6 @@ async def get_validator_pool_apy_rewards(
     validator_id: int,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{validator_id}/staking-rewards-object",
         httpx_client,
@@ -358,7 +355,6 @@ async def get_account_payday_stats(
     index: int,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/account/{index}/current-payday-stats",
         httpx_client,
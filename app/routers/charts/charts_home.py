@@ -17,7 +17,6 @@ async def get_charts_home(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
 
     user: UserV2 | None = await get_user_detailsv2(request)
     return templates.TemplateResponse(
@@ -39,7 +38,6 @@ async def get_plt_charts_home(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
 
     user: UserV2 | None = await get_user_detailsv2(request)
     return templates.TemplateResponse(
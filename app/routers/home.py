@@ -12,6 +12,7 @@ from ccdexplorer_fundamentals.GRPCClient.CCD_Types import (
     CCD_BlockItemSummary,
     CCD_ConsensusDetailedStatus,
 )
+from app.classes.search_resolver import SearchResolver
 from app.classes.dressingroom import (
     MakeUp,
     MakeUpRequest,
@@ -45,6 +46,7 @@ from app.utils import (
     create_dict_for_tabulator_display_for_accounts,
     create_dict_for_tabulator_display_for_blocks,
     get_url_from_api,
+    has_personal_labels,
     millify,
     tx_type_translation,
     tx_type_translation_for_js,
@@ -103,31 +105,9 @@ async def redirect_to_mainnet(
     if net not in ["mainnet", "testnet"]:
         return RedirectResponse(url="/mainnet", status_code=302)
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
     if "last_requests" not in request.state._state:
         request.state.last_requests = {}
 
-    if net == "mainnet":
-        request.state.api_calls["TPS"] = (
-            f"{request.app.api_url}/docs#/Transactions/get_transactions_tps_v2__net__transactions_info_tps_get"
-        )
-        request.state.api_calls["Markets Info"] = (
-            f"{request.app.api_url}/docs#/Markets/get_markets_info_v2_markets_info_get"
-        )
-
-    request.state.api_calls["Tx Count"] = (
-        f"{request.app.api_url}/docs#/Transactions/get_transactions_count_estimate_v2__net__transactions_info_count_get"
-    )
-
-    request.state.api_calls["Account Count"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_accounts_count_estimate_v2__net__accounts_info_count_get"
-    )
-    request.state.api_calls["Latest Blocks"] = (
-        f"{request.app.api_url}/docs#/Blocks/get_last_blocks_v2__net__blocks_last__count__get"
-    )
-    request.state.api_calls["Latest Txs"] = (
-        f"{request.app.api_url}/docs#/Transactions/get_last_transactions_v2__net__transactions_last__count__get"
-    )
     return templates.TemplateResponse(
         "home/home.html",
         {
@@ -240,71 +220,17 @@ async def search_all(
         return RedirectResponse(url="/mainnet", status_code=302)  # type: ignore
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    single_urls = {}
-    # order: account, block, transaction, module, instance, token
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/accounts/search/{value}",
-        httpx_client,
-    )
-    accounts_list = api_result.return_value if api_result.ok else []
-    for a in accounts_list:
-        single_urls[f"account-{a['account_index']}"] = (
-            f"/{net}/account/{accounts_list[0]['account_index']}"
-        )
-
     try:
-        value = int(value)
-        if value <= request.app.max_index_known[net]:  # type: ignore
+        if int(value) <= request.app.max_index_known[net]:  # type: ignore
             return RedirectResponse(url=f"/{net}/account/{value}", status_code=302)  # type: ignore
     except ValueError:
         pass
 
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/block/{value}",
-        httpx_client,
-    )
-    block_info = CCD_BlockInfo(**api_result.return_value) if api_result.ok else None  # type: ignore
-
-    if block_info:
-        single_urls["block"] = f"/{net}/block/{block_info.height}"
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/transaction/{value}", httpx_client
-    )
-    tx = CCD_BlockItemSummary(**api_result.return_value) if api_result.ok else None  # type: ignore
-
-    if tx:
-        single_urls["transaction"] = f"/{net}/transaction/{tx.hash}"
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/modules/search/{value}",
-        httpx_client,
-    )
-    modules = api_result.return_value if api_result.ok else []
-
-    for m in modules:
-        single_urls[f"module-{m['_id']}"] = f"/{net}/module/{modules[0]['_id']}"
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/tokens/search/{value}",
-        httpx_client,
-    )
-    tokens = api_result.return_value if api_result.ok else []
-
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/contracts/search/{value}",
-        httpx_client,
-    )
-    contracts = api_result.return_value if api_result.ok else []
-
-    for c in contracts:
-        single_urls[f"contract-{c['_id']}"] = f"/{net}/contract/{contracts[0]['_id']}"
-
-    for t in tokens:
-        single_urls[f"token-{t['_id']}"] = f"/{net}/tokens/{tokens[0]['_id']}"
-
-    if len(single_urls) == 1:
-        return RedirectResponse(url=single_urls[list(single_urls.keys())[0]], status_code=302)  # type: ignore
+    # only the lookups that can match the shape of value are fired, all at once.
+    resolver = SearchResolver(request.app.api_url, httpx_client, net)
+    result = await resolver.resolve(str(value))
+    if result.redirect_url:
+        return RedirectResponse(url=result.redirect_url, status_code=302)  # type: ignore
 
     html = templates.TemplateResponse(
         "home/search_all.html",
@@ -314,12 +240,12 @@ async def search_all(
             "net": net,
             "tags": tags,
             "user": user,
-            "accounts_list": accounts_list,
-            "block_info": block_info,
-            "tx": tx,
-            "contracts": contracts,
-            "tokens": tokens,
-            "modules": modules,
+            "accounts_list": result.accounts_list,
+            "block_info": result.block_info,
+            "tx": result.tx,
+            "contracts": result.contracts,
+            "tokens": result.tokens,
+            "modules": result.modules,
             "search_value": value,
         },
     )
@@ -515,18 +441,48 @@ async def home_tx_graph(
     return html
 
 
+def render_last_blocks(app, net: str, blocks: list[dict], tags, user) -> str:
+    return templates.get_template("home/last_blocks_table.html").render(
+        {
+            "blocks": [CCD_BlockInfo(**x) for x in blocks],
+            "net": net,
+            "tags": tags,
+            "user": user,
+            "app": app,
+        }
+    )
+
+
+def render_last_txs(app, net: str, txs: list[dict], tags, user) -> str:
+    return templates.get_template("home/last_txs_table.html").render(
+        {
+            "tx_type_translation": tx_type_translation,
+            "txs": [CCD_BlockItemSummary(**x) for x in txs],
+            "net": net,
+            "tags": tags,
+            "user": user,
+            "app": app,
+        }
+    )
+
+
 @router.get("/{net}/ajax_last_blocks", response_class=HTMLResponse)
 async def ajax_last_blocks(
     request: Request,
     net: str,
-    tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
     if net not in ["mainnet", "testnet"]:
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    latest_blocks = request.app.blocks_cache.get(net)
+    # rendered once per refresh by the scheduler, only personal labels need
+    # their own rendering.
+    fragment = request.app.home_fragments[net].get("blocks")
+    if fragment and not has_personal_labels(user):
+        return fragment.response(request)
+
+    latest_blocks = request.app.blocks_cache[net].latest(10)
     if not latest_blocks:
         error = f"Request error getting the most recent blocks on {net}."
         return templates.TemplateResponse(
@@ -539,18 +495,11 @@ async def ajax_last_blocks(
             },
         )
 
-    result = [CCD_BlockInfo(**x) for x in latest_blocks[:10]]
+    tags = await get_labeled_accounts(request)
     if "last_requests" not in request.state._state:
         request.state.last_requests = {}
-    html = templates.TemplateResponse(
-        "home/last_blocks_table.html",
-        {
-            "request": request,
-            "blocks": result,
-            "net": net,
-            "tags": tags,
-            "user": user,
-        },
+    html = HTMLResponse(
+        render_last_blocks(request.app, net, latest_blocks, tags, user)
     )
     request.state.last_requests["blocks"] = html
     return html
@@ -560,18 +509,21 @@ async def ajax_last_blocks(
 async def ajax_last_txs(
     request: Request,
     net: str,
-    tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
     if net not in ["mainnet", "testnet"]:
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
+    fragment = request.app.home_fragments[net].get("txs")
+    if fragment and not has_personal_labels(user):
+        return fragment.response(request)
+
     # api_result = await get_url_from_api(
     #     f"{request.app.api_url}/v2/{net}/transactions/last/10", httpx_client
     # )
     # latest_txs = api_result.return_value if api_result.ok else None
-    latest_txs = request.app.transactions_cache.get(net)
+    latest_txs = request.app.transactions_cache[net].latest(10)
     if not latest_txs:
         error = f"Request error getting the most recent transactions on {net}."
         return templates.TemplateResponse(
@@ -584,20 +536,10 @@ async def ajax_last_txs(
             },
         )
 
-    result = [CCD_BlockItemSummary(**x) for x in latest_txs[:10]]
+    tags = await get_labeled_accounts(request)
     if "last_requests" not in request.state._state:
         request.state.last_requests = {}
-    html = templates.TemplateResponse(
-        "home/last_txs_table.html",
-        {
-            "request": request,
-            "tx_type_translation": tx_type_translation,
-            "txs": result,
-            "net": net,
-            "tags": tags,
-            "user": user,
-        },
-    )
+    html = HTMLResponse(render_last_txs(request.app, net, latest_txs, tags, user))
 
     request.state.last_requests["txs"] = html
     return html
@@ -616,6 +558,22 @@ async def ajax_last_txs_own_page(
         return RedirectResponse(url="/mainnet", status_code=302)
     skip = (page - 1) * size
     user: UserV2 | None = await get_user_detailsv2(request)
+    # the first page(s) are decorated in the background already.
+    decorated = request.app.decorated_transactions[net]
+    total_rows = request.app.transactions_count.get(net)
+    if (
+        total_rows
+        and (skip + size <= len(decorated))
+        and not has_personal_labels(user)
+    ):
+        return JSONResponse(
+            {
+                "data": decorated[skip : skip + size],
+                "last_page": max(1, math.ceil(total_rows / size)),
+                "last_row": total_rows,
+            }
+        )
+
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/transactions/paginated/skip/{skip}/limit/{size}",
         httpx_client,
@@ -731,11 +689,17 @@ async def ajax_last_blocks_since(
     if net not in ["mainnet", "testnet"]:
         return RedirectResponse(url="/mainnet", status_code=302)
 
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/blocks/newer/than/{since_height}",
-        httpx_client,
-    )
-    blocks_result = api_result.return_value if api_result.ok else {}
+    # the scheduler keeps the newest blocks, the API is only needed for a page
+    # that has fallen further behind.
+    blocks_result = request.app.blocks_cache[net].newer_than(since_height)
+    if blocks_result is None:
+        api_result = await get_url_from_api(
+            f"{request.app.api_url}/v2/{net}/blocks/newer/than/{since_height}",
+            httpx_client,
+        )
+        blocks_result = api_result.return_value if api_result.ok else {}
+    elif not blocks_result:
+        return JSONResponse([])
     if not blocks_result:
         error = f"Request error getting the most recent blocks on {net}."
         return templates.TemplateResponse(
@@ -805,12 +769,25 @@ async def ajax_last_transactions_since(
     if net not in ["mainnet", "testnet"]:
         return RedirectResponse(url="/mainnet", status_code=302)
 
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/transactions/newer/than/{height}",
-        httpx_client,
-    )
-    txs_result = api_result.return_value if api_result.ok else []
-    if not api_result.ok:
+    if not has_personal_labels(user) and request.app.transactions_cache[net].covers(
+        height
+    ):
+        return JSONResponse(
+            [
+                row
+                for row in request.app.decorated_transactions[net]
+                if row["block_height_since"] > height
+            ]
+        )
+
+    txs_result = request.app.transactions_cache[net].newer_than(height)
+    if txs_result is None:
+        api_result = await get_url_from_api(
+            f"{request.app.api_url}/v2/{net}/transactions/newer/than/{height}",
+            httpx_client,
+        )
+        txs_result = api_result.return_value if api_result.ok else None
+    if txs_result is None:
         error = f"Request error getting the most recent blocks on {net}."
         return templates.TemplateResponse(
             "base/error.html",
@@ -911,10 +888,6 @@ async def transactions_page(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
-    request.state.api_calls["Latest Txs"] = (
-        f"{request.app.api_url}/docs#/Transactions/get_last_transactions_v2__net__transactions_last__count__get"
-    )
 
     return templates.TemplateResponse(
         "home/transactions.html",
@@ -940,10 +913,6 @@ async def blocks_page(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
-    request.state.api_calls["Latest Blocks"] = (
-        f"{request.app.api_url}/docs#/Blocks/get_last_blocks_v2__net__blocks_last__count__get"
-    )
 
     return templates.TemplateResponse(
         "home/blocks.html",
@@ -967,10 +936,6 @@ async def accounts_page(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
-    request.state.api_calls["Latest Accounts"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_last_accounts_v2__net__accounts_last__count__get"
-    )
     return templates.TemplateResponse(
         "home/accounts.html",
         {
@@ -1041,10 +1006,6 @@ async def consensus_page(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
-    request.state.api_calls["Consensus Detailed Status"] = (
-        f"{request.app.api_url}/docs#/Misc/get_consensus_detailed_status_v2__net__misc_consensus_detailed_status_get"
-    )
     return templates.TemplateResponse(
         "home/consensus.html",
         {
@@ -1067,10 +1028,6 @@ async def release_notes(
         httpx_client,
     )
     release_notes = api_result.return_value if api_result.ok else []
-    request.state.api_calls = {}
-    request.state.api_calls["Release Notes"] = (
-        f"{request.app.api_url}/docs#/Misc/get_release_notes_v2_misc_release_notes_get"
-    )
     return templates.TemplateResponse(
         "base/release_notes.html",
         {"env": request.app.env, "request": request, "release_notes": release_notes},
@@ -1082,8 +1039,6 @@ async def privacy_policy(
     request: Request,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
-    request.state.api_calls["None"] = ""
     return templates.TemplateResponse(
         "base/privacy_policy.html",
         {"env": request.app.env, "request": request},
@@ -1095,8 +1050,6 @@ async def support_explorer(
     request: Request,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
-    request.state.api_calls["None"] = ""
     return templates.TemplateResponse(
         "base/support.html",
         {
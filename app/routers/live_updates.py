@@ -0,0 +1,112 @@
+import json
+
+from ccdexplorer_fundamentals.GRPCClient.CCD_Types import CCD_BlockItemSummary
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import RedirectResponse
+from sse_starlette.sse import EventSourceResponse
+
+from app.classes.dressingroom import MakeUp, MakeUpRequest, RequestingRoute
+from app.classes.live_updates import LiveStream
+from app.state import read_reference_data
+from app.utils import (
+    create_dict_for_tabulator_display,
+    live_updates,
+)
+
+router = APIRouter()
+
+
+async def get_community_labels(app: FastAPI) -> dict | None:
+    return await read_reference_data(app, "labeled_accounts")
+
+
+async def decorate_transaction(
+    app: FastAPI,
+    net: str,
+    transaction: dict,
+    tags: dict | None,
+    wallet_contract_address: str | None = None,
+    public_key: str | None = None,
+) -> dict:
+    # rows are shared by all visitors, so they only carry the public labels.
+    makeup_request = MakeUpRequest(
+        **{
+            "net": net,
+            "httpx_client": app.httpx_client,
+            "tags": tags,
+            "user": None,
+            "app": app,
+            "requesting_route": RequestingRoute.transactions,
+        }
+    )
+    classified_tx = await MakeUp(makeup_request=makeup_request).prepare_for_display(
+        CCD_BlockItemSummary(**transaction), "", False
+    )
+    type_additional_info, sender = await classified_tx.transform_for_tabulator()
+    return create_dict_for_tabulator_display(
+        net,
+        classified_tx,
+        type_additional_info,
+        sender,
+        app,
+        tags,
+        wallet_contract_address,
+        public_key,
+    )
+
+
+async def decorate_latest_transactions(app: FastAPI, net: str, tags: dict | None):
+    """
+    Decorated rows for the transactions in the latest transactions buffer, in
+    the same order. Only transactions that weren't in the previous snapshot
+    are decorated.
+    """
+    previous = {row["hash_download"]: row for row in app.decorated_transactions[net]}
+    rows = []
+    for transaction in app.transactions_cache[net].items:
+        row = previous.get(transaction["hash"])
+        if row is None:
+            try:
+                row = await decorate_transaction(app, net, transaction, tags)
+            except Exception as error:
+                print(f"ERROR decorating {transaction['hash']} on {net}: {error}")
+                continue
+        rows.append(row)
+    app.decorated_transactions[net] = rows
+
+
+async def decorate_smart_wallet_transactions(
+    app: FastAPI, net: str, smart_wallet_txs: list[dict], tags: dict | None
+) -> list[dict]:
+    return [
+        await decorate_transaction(
+            app,
+            net,
+            x["tx"],
+            tags,
+            x["wallet_contract_address"],
+            x["public_key"],
+        )
+        for x in smart_wallet_txs
+    ]
+
+
+@router.get("/{net}/sse/{stream}")
+async def live_updates_sse(request: Request, net: str, stream: LiveStream):
+    """New rows for the blocks, transactions, accounts and smart wallets tables."""
+    if net not in ["mainnet", "testnet"]:
+        return RedirectResponse(url="/mainnet", status_code=302)
+
+    # sent by the browser when it reconnects, the id of the last batch it got.
+    last_event_id = request.headers.get("last-event-id", "")
+
+    async def events():
+        async for sequence, rows in live_updates.subscribe(
+            net, stream, int(last_event_id) if last_event_id.isdigit() else None
+        ):
+            if rows is None:
+                yield {"id": str(sequence), "event": "reload", "data": "reload"}
+            else:
+                yield {"id": str(sequence), "data": json.dumps(rows, default=str)}
+
+    return EventSourceResponse(events(), ping=15)
@@ -0,0 +1,74 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.classes.search_resolver import search_latency
+from app.env import environment
+from app.utils import (
+    api_circuit_breakers,
+    api_client_config,
+    api_hedged_requests,
+    api_response_cache,
+    api_route_metrics,
+    api_singleflight,
+    label_service,
+    live_updates,
+    scheduler_job_metrics,
+    worker_leader_election,
+    worker_snapshots,
+)
+
+
+def metrics_token(request: Request):
+    """
+    The metrics are for our own scrapers only: without the METRICS_TOKEN (as a
+    bearer token or ?token=) they don't exist.
+    """
+    expected = environment["METRICS_TOKEN"]
+    authorization = request.headers.get("authorization", "")
+    token = (
+        authorization.removeprefix("Bearer ")
+        if authorization.startswith("Bearer ")
+        else request.query_params.get("token", "")
+    )
+    if not expected or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(dependencies=[Depends(metrics_token)])
+
+
+@router.get("/metrics/api-client", response_class=JSONResponse)
+async def api_client_metrics(request: Request):
+    return JSONResponse(
+        {
+            "client": api_client_config.stats(),
+            "hedged_requests": api_hedged_requests.stats(),
+            "circuit_breakers": api_circuit_breakers.stats(),
+            "singleflight": api_singleflight.stats(),
+            "response_cache": api_response_cache.stats(),
+            "schema_cache": request.app.schema_cache.stats(),
+            "search": search_latency.stats(),
+            "scheduler_jobs": scheduler_job_metrics.stats(),
+            "live_updates": live_updates.stats(),
+            "labels": label_service.stats(),
+            "worker": {
+                **worker_leader_election.stats(),
+                "snapshots": worker_snapshots.stats(),
+            },
+            "address_stores": {
+                net: store.stats()
+                for net, store in request.app.addresses_to_indexes.items()
+            },
+        }
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # latency, status codes and bytes per API route template.
+    return Response(
+        generate_latest(api_route_metrics.registry), media_type=CONTENT_TYPE_LATEST
+    )
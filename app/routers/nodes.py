@@ -1,9 +1,16 @@
+import csv
 import datetime as dt
+import io
+import math
+from typing import Optional
 
 import httpx
 from ccdexplorer_fundamentals.user_v2 import UserV2
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from pydantic import BaseModel
+
+from app.classes.nodes_snapshot import NodesSnapshot
 
 from app.env import environment
 from app.jinja2_helpers import templates
@@ -16,6 +23,17 @@ from app.utils import get_url_from_api, human_readable_uptime
 
 router = APIRouter()
 
+# columns of the nodes table that can be sorted on the server.
+NODES_SORTABLE = (
+    "name",
+    "baker_id",
+    "stake",
+    "ping",
+    "version",
+    "uptime",
+    "finalizedBlockHeight",
+)
+
 
 @router.get("/{net}/nodes", response_class=HTMLResponse | RedirectResponse)
 async def nodes(
@@ -25,13 +43,6 @@ async def nodes(
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
     user: UserV2 | None = await get_user_detailsv2(request)
-    request.state.api_calls = {}
-    request.state.api_calls["Nodes and Validators"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_nodes_and_validators_v2__net__accounts_nodes_validators_get"
-    )
-    request.state.api_calls["Last Payday Info"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_last_payday_info_v2__net__accounts_last_payday_block_info_get"
-    )
     return templates.TemplateResponse(
         "/nodes/nodes.html",
         {
@@ -45,6 +56,66 @@ async def nodes(
     )
 
 
+def flatten_node(_id: str, node_info: dict) -> dict:
+    node = node_info.get("node")
+    validator = node_info.get("validator")
+    return {
+        "id": _id,
+        "name": node.get("nodeName") if node else "Not reporting",
+        "node": node.get("nodeId") if node else None,
+        "baker_id": validator.get("baker_id") if validator else None,
+        "stake": (
+            validator.get("pool_status", {})
+            .get("current_payday_info", {})
+            .get("lottery_power")
+            if validator
+            else None
+        ),
+        "ping": node.get("averagePing") if node else None,
+        "version": node.get("client") if node else None,
+        "peers": node.get("peersCount") if node else None,
+        "uptime": human_readable_uptime(node),
+        "finalizedBlockHeight": (node.get("finalizedBlockHeight") if node else None),
+    }
+
+
+def build_nodes_snapshot(
+    nodes_validators: dict, last_payday_block: dict | None
+) -> NodesSnapshot:
+    all = {
+        **nodes_validators["validator_nodes_by_account_id"],
+        **nodes_validators["non_validator_nodes_by_node_id"],
+        **nodes_validators["non_reporting_validators_by_validator_id"],
+    }
+    return NodesSnapshot(
+        [flatten_node(_id, node_info) for _id, node_info in all.items()],
+        NODES_SORTABLE,
+        nodes_validators,
+        last_payday_block,
+    )
+
+
+async def get_nodes_snapshot(
+    app, net: str, httpx_client: httpx.AsyncClient
+) -> NodesSnapshot | None:
+    """The snapshot from the nodes job, or a fresh one if it hasn't run yet."""
+    if app.nodes_snapshot.get(net):
+        return app.nodes_snapshot[net]
+    api_result = await get_url_from_api(
+        f"{app.api_url}/v2/{net}/accounts/nodes-validators",
+        httpx_client,
+    )
+    if not api_result.ok:
+        return None
+    nodes_validators = api_result.return_value
+    api_result = await get_url_from_api(
+        f"{app.api_url}/v2/{net}/accounts/last-payday-block/info",
+        httpx_client,
+    )
+    last_payday_block = api_result.return_value if api_result.ok else None
+    return build_nodes_snapshot(nodes_validators, last_payday_block)
+
+
 @router.get(
     "/ajax_nodes_to_html/{net}/{category}/{key}/{direction}/{api_key}",
     response_class=HTMLResponse,
@@ -60,16 +131,9 @@ async def get_ajax_nodes_v2(
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
     user: UserV2 | None = await get_user_detailsv2(request)
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/accounts/nodes-validators",
-        httpx_client,
-    )
-    nodes_validators = api_result.return_value if api_result.ok else {}
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/accounts/last-payday-block/info",
-        httpx_client,
-    )
-    last_payday_block = api_result.return_value if api_result.ok else None
+    nodes_snapshot = await get_nodes_snapshot(request.app, net, httpx_client)
+    nodes_validators = nodes_snapshot.nodes_validators if nodes_snapshot else {}
+    last_payday_block = nodes_snapshot.last_payday_block if nodes_snapshot else None
     len_nodes = len(nodes_validators["all_nodes_by_node_id"])
     len_validators = len(nodes_validators["all_validators_by_validator_id"])
     len_validator_nodes = len(nodes_validators["validator_nodes_by_account_id"])
@@ -95,78 +159,82 @@ async def get_ajax_nodes_v2(
     )
 
 
-@router.get("/mainnet/ajax_nodes_tabulator", response_class=Response)
+class SortItem(BaseModel):
+    field: str
+    dir: str
+
+
+class FilterItem(BaseModel):
+    field: str
+    type: str
+    value: str
+
+
+class TabulatorRequest(BaseModel):
+    page: int
+    size: int
+    sort: Optional[list[SortItem]] = []
+    filter: Optional[list[FilterItem]] = []
+
+
+@router.post("/mainnet/ajax_nodes_tabulator", response_class=Response)
 async def get_ajax_nodes_tabulator(
     request: Request,
-    tags: dict = Depends(get_labeled_accounts),
+    body: TabulatorRequest,
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    user: UserV2 | None = await get_user_detailsv2(request)
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/mainnet/accounts/nodes-validators",
-        httpx_client,
+    """
+    One page of nodes, sorted and filtered on the snapshot from the nodes job.
+    """
+    nodes_snapshot = await get_nodes_snapshot(request.app, "mainnet", httpx_client)
+    if not nodes_snapshot:
+        return JSONResponse({"data": [], "last_page": 1, "last_row": 0})
+
+    if body.sort and len(body.sort) > 0:
+        sort_key = body.sort[0].field
+        direction = body.sort[0].dir
+    else:
+        sort_key = "stake"
+        direction = "desc"
+
+    skip = (body.page - 1) * body.size
+    rows, total_rows = nodes_snapshot.query(
+        sort_key,
+        direction,
+        [(f.field, f.type, f.value) for f in body.filter or []],
+        skip,
+        body.size,
     )
-    nodes_validators = api_result.return_value if api_result.ok else {}
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/mainnet/accounts/last-payday-block/info",
-        httpx_client,
+    last_page = math.ceil(total_rows / body.size)
+    return JSONResponse(
+        {
+            "data": rows,
+            "last_page": max(1, last_page),
+            "last_row": total_rows,
+        }
     )
-    last_payday_block = api_result.return_value if api_result.ok else None
-    len_nodes = len(nodes_validators["all_nodes_by_node_id"])
-    len_validators = len(nodes_validators["all_validators_by_validator_id"])
-    len_reporting_validators = len(nodes_validators["validator_nodes_by_account_id"])
 
-    all = {
-        **nodes_validators["validator_nodes_by_account_id"],
-        **nodes_validators["non_validator_nodes_by_node_id"],
-        **nodes_validators["non_reporting_validators_by_validator_id"],
-    }
-    # dict(dict(
-    # nodes_validators.validator_nodes_by_account_id, **
-    # nodes_validators.non_validator_nodes_by_node_id), **
-    # nodes_validators.non_reporting_validators_by_validator_id)
-    flat_data = []
-    for _id, node_info in all.items():
-        node = node_info.get("node")
-        validator = node_info.get("validator")
-
-        flat_data.append(
-            {
-                "id": _id,
-                "name": node.get("nodeName") if node else "Not reporting",
-                "node": node.get("nodeId") if node else None,
-                "baker_id": validator.get("baker_id") if validator else None,
-                "stake": (
-                    validator.get("pool_status", {})
-                    .get("current_payday_info", {})
-                    .get("lottery_power")
-                    if validator
-                    else None
-                ),
-                "ping": node.get("averagePing") if node else None,
-                "version": node.get("client") if node else None,
-                "peers": node.get("peersCount") if node else None,
-                "uptime": human_readable_uptime(node),
-                "finalizedBlockHeight": (
-                    node.get("finalizedBlockHeight") if node else None
-                ),
-            }
-        )
-
-    return JSONResponse(flat_data)
-    # return templates.TemplateResponse(
-    #     "/nodes/nodes_ajax.html",
-    #     {
-    #         "env": environment,
-    #         "request": request,
-    #         "user": user,
-    #         "tags": tags,
-    #         "net": net,
-    #         "category": category,
-    #         "last_payday_block": last_payday_block,
-    #         "nodes_validators": nodes_validators,
-    #         "len_nodes": len_nodes,
-    #         "len_validators": len_validators,
-    #         "len_reporting_validators": len_reporting_validators,
-    #     },
-    # )
+
+@router.get("/mainnet/ajax_nodes_csv", response_class=Response)
+async def get_ajax_nodes_csv(
+    request: Request,
+    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+):
+    """
+    All nodes as csv, the table only has the current page to download.
+    """
+    nodes_snapshot = await get_nodes_snapshot(request.app, "mainnet", httpx_client)
+    output = io.StringIO()
+    if nodes_snapshot:
+        rows, _ = nodes_snapshot.query("stake", "desc", [], 0, nodes_snapshot.size)
+        writer = csv.DictWriter(output, fieldnames=nodes_snapshot.fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    filename = (
+        f"nodes-and-validators (generated on {dt.datetime.now():%Y-%m-%d %H-%M-%S}).csv"
+    )
+    return Response(
+        output.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,10 +1,14 @@
 # ruff: noqa: F403, F405, E402, E501, E722
 
 # import collections
+import asyncio
 import base64
+import contextvars
 import json
+import os
 import uuid
 from bisect import bisect_right
+from typing import AsyncIterator
 
 import numpy as np
 import pandas as pd
@@ -30,7 +34,10 @@ from app.classes.dressingroom import (
 from app.env import *
 from app.jinja2_helpers import *
 from app.state import get_httpx_client, get_labeled_accounts, get_user_detailsv2
-from app.utils import create_dict_for_tabulator_display_for_contracts
+from app.utils import (
+    create_dict_for_tabulator_display_for_contracts,
+    stream_url_from_api,
+)
 
 router = APIRouter()
 
@@ -550,7 +557,6 @@ async def module_module_address(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     user: UserV2 | None = await get_user_detailsv2(request)
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/module/{module_ref}",
@@ -637,21 +643,6 @@ async def module_module_address(
             "error": True,
             "errorMessage": f"No module on {net} found at {module_ref}.",
         }
-    request.state.api_calls["Module Info"] = (
-        f"{request.app.api_url}/docs#/Module/get_module_v2__net__module__module_ref__get"
-    )
-    request.state.api_calls["Deployed Tx"] = (
-        f"{request.app.api_url}/docs#/Module/get_module_deployment_tx_v2__net__module__module_ref__deployed_get"
-    )
-    request.state.api_calls["Module Schema"] = (
-        f"{request.app.api_url}/docs#/Module/get_module_schema_v2__net__module__module_ref__schema_get"
-    )
-    request.state.api_calls["Module Instances"] = (
-        f"{request.app.api_url}/docs#/Module/get_module_instances_v2__net__module__module_ref__instances__skip___limit__get"
-    )
-    request.state.api_calls["Module Usage"] = (
-        f"{request.app.api_url}/docs#/Module/get_module_usage_v2__net__module__module_ref__usage_get"
-    )
     return templates.TemplateResponse(
         "smart_contracts/smart_module.html",
         {
@@ -786,102 +777,286 @@ async def ajax_track_item_id(
     return html
 
 
-@router.get("/{net}/contract/{instance_index}/{subindex}")
-@router.get("/{net}/instance/{instance_index}/{subindex}")
-async def smart_contract_page(
+# Sections of the contract page that are not needed to render the page itself.
+# If they are not in after this many seconds, the page is sent with a placeholder
+# that loads the section through htmx.
+SMART_CONTRACT_PAGE_DEADLINE = 1.5
+EVENTS_TO_FILE_BATCH_SIZE = 1_000
+# how long a finished TnT task (its item ids and csv) is kept, so the htmx
+# placeholder of a page that missed the deadline gets it without a new stream.
+TNT_TASK_TTL = 60
+contract_tnt_tasks: dict[str, asyncio.Task] = {}
+
+
+async def get_contract_more_info(
     request: Request,
     net: str,
     instance_index: int,
     subindex: int,
-    tags: dict = Depends(get_labeled_accounts),
-    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+    httpx_client: httpx.AsyncClient,
+):
+    api_result, supports_result = await asyncio.gather(
+        get_url_from_api(
+            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/deployed",
+            httpx_client,
+        ),
+        get_url_from_api(
+            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/supports-cis-standards",
+            httpx_client,
+        ),
+    )
+    return {
+        "tx_deployed": (
+            CCD_BlockItemSummary(**api_result.return_value) if api_result.ok else None
+        ),
+        "supports_cis_standards": (
+            supports_result.return_value if supports_result.ok else []
+        ),
+    }
+
+
+async def get_contract_tnt(
+    api_url: str,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    httpx_client: httpx.AsyncClient,
 ):
-    request.state.api_calls = {}
-    user: UserV2 | None = await get_user_detailsv2(request)
     instance_address = f"<{instance_index},{subindex}>"
+    # the logged events are only needed for the csv, so they are streamed
+    # straight into it.
+    api_result, filename = await asyncio.gather(
+        get_url_from_api(
+            f"{api_url}/v2/{net}/contract/{instance_index}/{subindex}/tnt/ids",
+            httpx_client,
+        ),
+        events_to_file(
+            instance_address,
+            stream_url_from_api(
+                f"{api_url}/v2/{net}/contract/{instance_index}/{subindex}/tnt/logged-events",
+                httpx_client,
+            ),
+        ),
+    )
+    return {
+        "item_ids": api_result.return_value if api_result.ok else [],
+        "filename": filename,
+    }
+
+
+def contract_tnt_task(
+    api_url: str,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    httpx_client: httpx.AsyncClient,
+) -> asyncio.Task:
+    """The running (or recently finished) TnT task of a contract, started if there is none."""
+    key = f"{net}/{instance_index}/{subindex}"
+    task = contract_tnt_tasks.get(key)
+    if task is None:
+        # a context of its own, the task is shared, so its API calls don't
+        # belong in the trace of the visitor who happened to start it.
+        task = asyncio.create_task(
+            get_contract_tnt(api_url, net, instance_index, subindex, httpx_client),
+            context=contextvars.Context(),
+        )
+        contract_tnt_tasks[key] = task
+        task.add_done_callback(lambda t: forget_contract_tnt_task(key, t))
+    return task
+
+
+def forget_contract_tnt_task(key: str, task: asyncio.Task):
+    def forget():
+        if contract_tnt_tasks.get(key) is task:
+            del contract_tnt_tasks[key]
+
+    if task.cancelled() or task.exception():
+        # a failed stream is tried again on the next request.
+        forget()
+    else:
+        asyncio.get_running_loop().call_later(TNT_TASK_TTL, forget)
+
+
+def tnt_error_message(net: str, instance_index: int, subindex: int) -> str:
+    return f"Error getting the logged events on {net} for <{instance_index},{subindex}>, please try again later."
+
+
+async def get_contract_tag_information(
+    request: Request,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    httpx_client: httpx.AsyncClient,
+):
     api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/supports-cis-standard/CIS-6",
+        f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/tag-info",
         httpx_client,
     )
-    if api_result.ok:
-        supports_cis6 = api_result.return_value
-        if supports_cis6:
-            api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/tnt/ids",
-                httpx_client,
-            )
-            item_ids = api_result.return_value if api_result.ok else []
+    return MongoTypeTokensTag(**api_result.return_value) if api_result.ok else None
 
-            api_result = await get_url_from_api(
-                f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/tnt/logged-events",
-                httpx_client,
-            )
-            all_logged_events = api_result.return_value if api_result.ok else []
 
-            filename = events_to_file(instance_address, all_logged_events)
-        else:
-            item_ids = None
-            filename = None
+def result_if_done(task: asyncio.Task):
+    if task.done() and not task.cancelled() and not task.exception():
+        return task.result()
+    # still running, let it finish in the background (the htmx placeholder
+    # picks up the TnT task, see contract_tnt_task), but don't log its outcome.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return None
 
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/tokens-available",
-            httpx_client,
-        )
-        tokens_available = api_result.return_value if api_result.ok else False
 
-        api_result = await get_url_from_api(
+@router.get(
+    "/ajax_contract_more_info/{net}/{instance_index}/{subindex}",
+    response_class=HTMLResponse,
+)
+async def ajax_contract_more_info(
+    request: Request,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+):
+    api_result, more_info = await asyncio.gather(
+        get_url_from_api(
             f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/info",
             httpx_client,
-        )
-        contract = (
-            MongoTypeInstance(**api_result.return_value) if api_result.ok else None
-        )
+        ),
+        get_contract_more_info(request, net, instance_index, subindex, httpx_client),
+    )
+    contract = MongoTypeInstance(**api_result.return_value) if api_result.ok else None
+    if not contract:
+        return ""
+    return templates.get_template(
+        "smart_contracts/smart_contract_more_info.html"
+    ).render(
+        {
+            "details": contract.v0 if contract.v0 else contract.v1,
+            "net": net,
+            **more_info,
+        }
+    )
 
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/tag-info",
-            httpx_client,
-        )
-        tag_information = (
-            MongoTypeTokensTag(**api_result.return_value) if api_result.ok else None
-        )
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/deployed",
-            httpx_client,
+
+@router.get(
+    "/ajax_contract_tnt/{net}/{instance_index}/{subindex}",
+    response_class=HTMLResponse,
+)
+async def ajax_contract_tnt(
+    request: Request,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+):
+    # shielded, the task is shared with the page (and other visitors).
+    try:
+        tnt = await asyncio.shield(
+            contract_tnt_task(
+                request.app.api_url, net, instance_index, subindex, httpx_client
+            )
         )
-        tx_deployed = (
-            CCD_BlockItemSummary(**api_result.return_value) if api_result.ok else None
+    except Exception as error:
+        print(
+            f"ERROR getting TnT for <{instance_index},{subindex}> on {net}: {error!r}"
         )
+        return templates.get_template(
+            "smart_contracts/smart_contract_tnt.html"
+        ).render({"tnt_error": tnt_error_message(net, instance_index, subindex)})
+    return templates.get_template("smart_contracts/smart_contract_tnt.html").render(
+        {
+            "net": net,
+            "item_ids": tnt["item_ids"],
+            "filename": tnt["filename"],
+        }
+    )
 
-        api_result = await get_url_from_api(
-            f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}/supports-cis-standards",
-            httpx_client,
-        )
-        supports_cis_standards = api_result.return_value if api_result.ok else []
 
-        request.state.api_calls["Instance Info"] = (
-            f"{request.app.api_url}/docs#/Contract/get_instance_information_v2__net__contract__contract_index___contract_subindex__info_get"
-        )
-        request.state.api_calls["Verified Information"] = (
-            f"{request.app.api_url}/docs#/Contract/get_instance_tag_information_v2__net__contract__contract_index___contract_subindex__tag_info_get"
-        )
-        request.state.api_calls["Tokens Available"] = (
-            f"{request.app.api_url}/docs#/Contract/get_contract_tokens_available_v2__net__contract__contract_index___contract_subindex__tokens_available_get"
-        )
-        request.state.api_calls["Deployed Tx"] = (
-            f"{request.app.api_url}/docs#/Contract/get_contract_deployment_tx_v2__net__contract__contract_index___contract_subindex__deployed_get"
+@router.get("/{net}/contract/{instance_index}/{subindex}")
+@router.get("/{net}/instance/{instance_index}/{subindex}")
+async def smart_contract_page(
+    request: Request,
+    net: str,
+    instance_index: int,
+    subindex: int,
+    tags: dict = Depends(get_labeled_accounts),
+    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
+):
+    instance_address = f"<{instance_index},{subindex}>"
+    contract_url = (
+        f"{request.app.api_url}/v2/{net}/contract/{instance_index}/{subindex}"
+    )
+
+    # everything on this page is keyed on the contract address only, so all
+    # calls go out at once.
+    user_task = asyncio.ensure_future(get_user_detailsv2(request))
+    cis6_task = asyncio.ensure_future(
+        get_url_from_api(f"{contract_url}/supports-cis-standard/CIS-6", httpx_client)
+    )
+    info_task = asyncio.ensure_future(
+        get_url_from_api(f"{contract_url}/info", httpx_client)
+    )
+    tokens_available_task = asyncio.ensure_future(
+        get_url_from_api(f"{contract_url}/tokens-available", httpx_client)
+    )
+    more_info_task = asyncio.ensure_future(
+        get_contract_more_info(request, net, instance_index, subindex, httpx_client)
+    )
+    tag_information_task = asyncio.ensure_future(
+        get_contract_tag_information(
+            request, net, instance_index, subindex, httpx_client
         )
-        request.state.api_calls["Instance Transactions"] = (
-            f"{request.app.api_url}/docs#/Account/get_account_txs_v2__net__account__account_id__transactions__skip___limit__get"
+    )
+    optional_tasks = [more_info_task]
+
+    api_result = await cis6_task
+    supports_cis6 = api_result.return_value if api_result.ok else None
+    if supports_cis6:
+        tnt_task = contract_tnt_task(
+            request.app.api_url, net, instance_index, subindex, httpx_client
         )
-        request.state.api_calls["Token Information"] = (
-            f"{request.app.api_url}/docs#/Contract/get_token_information_v2__net__contract__contract_index___contract_subindex__token_information_get"
+        optional_tasks.append(tnt_task)
+    else:
+        tnt_task = None
+
+    # the tag information has no placeholder, so the page waits for it.
+    user, info_result, tokens_available_result, tag_information = (
+        await asyncio.gather(
+            user_task, info_task, tokens_available_task, tag_information_task
         )
-        request.state.api_calls["Schema from Source"] = (
-            f"{request.app.api_url}/docs#/Contract/get_schema_from_source_v2__net__contract__contract_index___contract_subindex__schema_from_source_get"
+    )
+
+    if api_result.ok:
+        tokens_available = (
+            tokens_available_result.return_value
+            if tokens_available_result.ok
+            else False
         )
-        request.state.api_calls["Supports CIS Standards"] = (
-            f"{request.app.api_url}/docs#/Contract/get_instance_CIS_support_multiple_v2__net__contract__contract_index___contract_subindex__supports_cis_standards_get"
+        contract = (
+            MongoTypeInstance(**info_result.return_value) if info_result.ok else None
         )
+
+        await asyncio.wait(optional_tasks, timeout=SMART_CONTRACT_PAGE_DEADLINE)
+        more_info = result_if_done(more_info_task)
+        tnt = result_if_done(tnt_task) if tnt_task else None
+        tnt_error = None
+        if (
+            tnt_task
+            and tnt_task.done()
+            and not tnt_task.cancelled()
+            and tnt_task.exception()
+        ):
+            print(
+                f"ERROR getting TnT for {instance_address} on {net}: {tnt_task.exception()!r}"
+            )
+            tnt_error = tnt_error_message(net, instance_index, subindex)
+
+        if tnt:
+            item_ids = tnt["item_ids"]
+            filename = tnt["filename"]
+        else:
+            item_ids = None
+            filename = None
+
         if contract:
             error = None
             # dressed_up_contract = contracts_with_tag_info.get(contract.id)
@@ -891,7 +1066,8 @@ async def smart_contract_page(
                     "env": request.app.env,
                     "request": request,
                     "error": error,
-                    "tx_deployed": tx_deployed,
+                    "more_info_loaded": more_info is not None,
+                    "tx_deployed": more_info["tx_deployed"] if more_info else None,
                     "tokens_available": tokens_available,
                     "contract": contract,
                     "index": instance_index,
@@ -902,14 +1078,21 @@ async def smart_contract_page(
                     "net": net,
                     "instance_address": instance_address,
                     "supports_cis6": supports_cis6,
+                    "tnt_loaded": (tnt is not None) or (tnt_error is not None),
+                    "tnt_error": tnt_error,
                     "item_ids": item_ids,
                     "filename": filename,
-                    "supports_cis_standards": supports_cis_standards,
+                    "supports_cis_standards": (
+                        more_info["supports_cis_standards"] if more_info else []
+                    ),
                     "tx_type_translation_from_python": tx_type_translation_for_js(),
                 },
             )
     # api_result NOT ok
     else:
+        # no contract, so no TnT task either.
+        for task in optional_tasks:
+            task.cancel()
         if api_result.status_code == 404:
             error = {
                 "error": True,
@@ -932,10 +1115,15 @@ async def smart_contract_page(
         )
 
 
-def events_to_file(instance_address: str, all_logged_events: list):
-    df = pd.json_normalize(all_logged_events)
-    if len(df) == 0:
-        return None
+def logged_events_to_frame(logged_events: list):
+    df = pd.json_normalize(logged_events)
+    for column in [
+        "recognized_event.new_status",
+        "recognized_event.initial_status",
+        "recognized_event.item_id",
+    ]:
+        if column not in df:
+            df[column] = None
     df.drop(
         [
             "recognized_event.tag",
@@ -951,6 +1139,8 @@ def events_to_file(instance_address: str, all_logged_events: list):
         ],
         axis=1,
         inplace=True,
+        # a batch of events doesn't necessarily have all optional fields.
+        errors="ignore",
     )
     df["recognized_event.new_status"] = df["recognized_event.new_status"].fillna("")
     df["recognized_event.initial_status"] = df[
@@ -972,7 +1162,60 @@ def events_to_file(instance_address: str, all_logged_events: list):
         axis=1,
         inplace=True,
     )
+    return df
+
+
+async def events_to_file(instance_address: str, logged_events: AsyncIterator[dict]):
+    """
+    Writes the logged events to a csv in batches, so memory use doesn't grow
+    with the number of events a contract has.
+    """
     filename = f"/tmp/track_and_trace - contract {instance_address} | {dt.datetime.now():%Y-%m-%d %H-%M-%S} - {uuid.uuid4()}.csv"
-    # df_group.columns = [f"{tooltip} Ending", "Sum of Fees (CCD)"]
-    df.to_csv(filename, index=False)
-    return filename
+    columns = None
+    batch = []
+    try:
+        async for event in logged_events:
+            batch.append(event)
+            if len(batch) == EVENTS_TO_FILE_BATCH_SIZE:
+                columns = append_events_to_file(filename, batch, columns)
+                batch = []
+        if batch:
+            columns = append_events_to_file(filename, batch, columns)
+    except BaseException:
+        # no half a csv, the caller shows an error instead.
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+    return filename if columns else None
+
+
+def append_events_to_file(filename: str, batch: list, columns: list | None):
+    df = logged_events_to_frame(batch)
+    if columns is None:
+        df.to_csv(filename, index=False)
+        return list(df.columns)
+    new_columns = [column for column in df.columns if column not in columns]
+    if new_columns:
+        columns = columns + new_columns
+        widen_events_file(filename, columns)
+    df.reindex(columns=columns).to_csv(filename, mode="a", header=False, index=False)
+    return columns
+
+
+def widen_events_file(filename: str, columns: list):
+    """
+    Rewrites the csv with columns that a later batch brought in, empty for the
+    rows written so far. Chunked, like the writing.
+    """
+    tmp_filename = f"{filename}.tmp"
+    chunks = pd.read_csv(
+        filename,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=EVENTS_TO_FILE_BATCH_SIZE,
+    )
+    for i, chunk in enumerate(chunks):
+        chunk.reindex(columns=columns).to_csv(
+            tmp_filename, mode="a" if i else "w", header=not i, index=False
+        )
+    os.replace(tmp_filename, filename)
@@ -23,6 +23,7 @@ from app.utils import (
     ccdexplorer_plotly_template,
     from_address_to_index,
     get_url_from_api,
+    has_personal_labels,
     create_dict_for_tabulator_display,
     pagination_calculator,
     tx_type_translation,
@@ -249,7 +250,6 @@ async def get_public_key_page(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
     user: UserV2 | None = await get_user_detailsv2(request)
     wallet_contract_address = CCD_ContractAddress.from_index(index, subindex).to_str()
 
@@ -327,7 +327,6 @@ async def get_public_key_page(
 #     tags: dict = Depends(get_labeled_accounts),
 #     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 # ):
-#     request.state.api_calls = {}
 
 #     user: UserV2 | None = await get_user_detailsv2(request)
 #     api_result = await get_url_from_api(
@@ -355,7 +354,6 @@ async def get_smart_wallets_overview_with_txs(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
 
     user: UserV2 | None = await get_user_detailsv2(request)
     # api_result = await get_url_from_api(
@@ -394,6 +392,17 @@ async def ajax_last_txs_for_smart_wallets(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
+    # the first page(s) are decorated in the background already.
+    decorated = request.app.decorated_smart_wallet_txs[net]
+    if (skip + size <= len(decorated)) and not has_personal_labels(user):
+        return JSONResponse(
+            {
+                "data": decorated[skip : skip + size],
+                "last_page": max(1, math.ceil(100_000 / size)),
+                "last_row": 100_000,
+            }
+        )
+
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/smart-wallets/transactions/paginated/skip/{skip}/limit/{size}",
         httpx_client,
@@ -473,6 +482,16 @@ async def ajax_last_txs_for_smart_wallets_since(
         return RedirectResponse(url="/mainnet", status_code=302)
 
     user: UserV2 | None = await get_user_detailsv2(request)
+    decorated = request.app.decorated_smart_wallet_txs[net]
+    if (
+        decorated
+        and (height >= decorated[-1]["block_height_since"])
+        and not has_personal_labels(user)
+    ):
+        return JSONResponse(
+            [row for row in decorated if row["block_height_since"] > height]
+        )
+
     api_result = await get_url_from_api(
         f"{request.app.api_url}/v2/{net}/smart-wallets/transactions/newer/than/{height}",
         httpx_client,
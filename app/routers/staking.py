@@ -10,6 +10,7 @@ from dateutil import parser
 from ccdexplorer_fundamentals.user_v2 import UserV2
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
+from jinja2.utils import htmlsafe_json_dumps
 
 from app.classes.Enums import PoolStatus
 from app.env import environment
@@ -33,70 +34,69 @@ from app.utils import (
 router = APIRouter()
 
 
+def suspended_validator_row(
+    net: str, suspended_id: str, suspensions: list, primed: list
+) -> dict:
+    suspended_since = dateutil.parser.parse(suspensions[0])
+    return {
+        "validator_id": f'<a class="" href="/{net}/account/{suspended_id}"><i class="bi bi-person-bounding-box pe-1"></i><span style="font-family: monospace, monospace;" class="small">{suspended_id}</span></a>',
+        "suspended_since": f'<span class="ccd">{suspended_since:%Y-%m-%d}</span>',
+        "suspended_days": f'<span class="ccd">{humanize_age(suspended_since)}</span>',
+        "count_of_suspension": f'<span class="ccd">{len(suspensions)}</span>',
+        "count_of_primed": f'<span class="ccd">{len(primed)}</span>',
+        "validator_id_download": suspended_id,
+        "suspended_since_download": f"{suspended_since:%Y-%m-%d}",
+        "suspended_days_download": humanize_age(suspended_since),
+        "count_of_suspension_download": len(suspensions),
+        "count_of_primed_download": len(primed),
+    }
+
+
+def build_staking_page(
+    app, account_apy_object: dict | None, net: str = "mainnet"
+) -> dict:
+    """
+    Everything the staking page shows, built from the pools and primed/suspended
+    caches whenever those refresh. The tables are serialized here as well, the
+    page only has to render them.
+    """
+    all_pools = [
+        create_dict_for_tabulator_display_for_pools(net, pool)
+        for pool in app.staking_pools_cache
+        if "baker_id" in pool
+    ]
+    primed_validators = app.primed_suspended_cache.get("primed_validators", {})
+    suspended_data = [
+        suspended_validator_row(
+            net,
+            suspended_id,
+            suspensions,
+            primed_validators.get(suspended_id, []),
+        )
+        for suspended_id, suspensions in app.primed_suspended_cache.get(
+            "suspended_validators", {}
+        ).items()
+    ]
+    return {
+        "account_apy_object": account_apy_object,
+        "all_pools": all_pools,
+        "all_pools_json": htmlsafe_json_dumps(all_pools),
+        "suspended_data_json": htmlsafe_json_dumps(suspended_data),
+    }
+
+
 @router.get("/{net}/staking")  # type:ignore
 async def staking(
     request: Request,
     net: str,
-    tags: dict = Depends(get_labeled_accounts),
-    httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
     user: UserV2 | None = await get_user_detailsv2(request)
-    api_result = await get_url_from_api(
-        f"{request.app.api_url}/v2/{net}/account/passive_delegation/staking-rewards-object/passive_delegation",
-        httpx_client,
-    )
-    account_apy_object = api_result.return_value if api_result.ok else None
 
-    request.state.api_calls = {}
-    request.state.api_calls["Paydays"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_paydays_v2__net__accounts_paydays__skip___limit__get"
-    )
-    request.state.api_calls["Pools"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_payday_pools_v2__net__accounts_paydays_pools__status__get"
-    )
-    request.state.api_calls["Passive Delegation Info"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_payday_passive_info_v2__net__accounts_paydays_passive_delegation_get"
-    )
-    request.state.api_calls["Passive Delegators"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_payday_passive_delegators_v2__net__accounts_paydays_passive_delegators__skip___limit__get"
-    )
     if net == "mainnet":
-        all_pools: dict = request.app.staking_pools_cache
-        made_up_pools = []
-        for pool in all_pools:
-            if "baker_id" in pool:
-                made_up_pools.append(
-                    create_dict_for_tabulator_display_for_pools("mainnet", pool)
-                )
-        suspended_data = []
-        for suspended_id, value in request.app.primed_suspended_cache.get(
-            "suspended_validators"
-        ).items():
-            suspended_data.append(
-                {
-                    "validator_id": f'<a class="" href="/{net}/account/{suspended_id}"><i class="bi bi-person-bounding-box pe-1"></i><span style="font-family: monospace, monospace;" class="small">{suspended_id}</span></a>',
-                    "suspended_since": f'<span class="ccd">{dateutil.parser.parse(value[0]):%Y-%m-%d}</span>',
-                    "suspended_days": f'<span class="ccd">{humanize_age(dateutil.parser.parse(value[0]))}</span>',
-                    "count_of_suspension": f'<span class="ccd">{len(value)}</span>',
-                    "count_of_primed": f'<span class="ccd">{len(
-                        request.app.primed_suspended_cache.get("primed_validators").get(
-                            suspended_id, []
-                        )
-                    )}</span>',
-                    "validator_id_download": suspended_id,
-                    "suspended_since_download": f"{dateutil.parser.parse(value[0]):%Y-%m-%d}",
-                    "suspended_days_download": humanize_age(
-                        dateutil.parser.parse(value[0])
-                    ),
-                    "count_of_suspension_download": len(value),
-                    "count_of_primed_download": len(
-                        request.app.primed_suspended_cache.get("primed_validators").get(
-                            suspended_id, []
-                        )
-                    ),
-                }
-            )
-
+        # built by the staking pools job, see main.py.
+        staking_page: dict = request.app.staking_page or build_staking_page(
+            request.app, None
+        )
         return templates.TemplateResponse(
             "staking/staking_tabs.html",
             {
@@ -105,9 +105,9 @@ async def staking(
                 "request": request,
                 "delegation": True,
                 "passive_delegation": True,
-                "account_apy_object": account_apy_object,
-                "suspended_data": suspended_data,
-                "all_pools": made_up_pools,
+                "account_apy_object": staking_page["account_apy_object"],
+                "suspended_data_json": staking_page["suspended_data_json"],
+                "all_pools_json": staking_page["all_pools_json"],
                 # "passive_object": passive_object,
                 # "passive_info_v2": passive_info_v2,
                 "user": user,
@@ -271,14 +271,10 @@ async def get_ajax_pools(
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
 
-    all_pools: dict = request.app.staking_pools_cache
-
-    made_up_pools = []
-    for pool in all_pools:
-        if "baker_id" in pool:
-            made_up_pools.append(
-                create_dict_for_tabulator_display_for_pools("mainnet", pool)
-            )
+    staking_page: dict = request.app.staking_page or build_staking_page(
+        request.app, None
+    )
+    made_up_pools = staking_page["all_pools"]
     total_rows = len(made_up_pools)  # type: ignore
     last_page = math.ceil(total_rows / size)
     return JSONResponse(
@@ -130,13 +130,6 @@ async def slash_tokens(
         non_fungible_tokens_verified = (
             api_result.return_value if api_result.ok else None
         )
-    request.state.api_calls = {}
-    request.state.api_calls["Fungible Tokens"] = (
-        f"{request.app.api_url}/docs#/Tokens/get_fungible_tokens_verified_v2__net__tokens_fungible_tokens_verified_get"
-    )
-    request.state.api_calls["Non-Fungible Tokens"] = (
-        f"{request.app.api_url}/docs#/Tokens/get_non_fungible_tokens_verified_v2__net__tokens_non_fungible_tokens_verified_get"
-    )
     return templates.TemplateResponse(
         "tokens/tokens.html",
         {
@@ -433,10 +426,6 @@ async def get_paginated_cis2_nft_tokens(
 #         returned_rows=len(nft_tokens),
 #     )
 #     pagination = pagination_calculator(pagination_request)
-#     request.state.api_calls = {}
-#     request.state.api_calls["NFT Tokens"] = (
-#         f"{request.app.api_url}/docs#/Token/get_nft_tag_tokens_v2__net__token_tag__tag___skip___limit__get"
-#     )
 #     html = templates.get_template("tokens/nft_tag/nft_tag_tokens.html").render(
 #         {
 #             "nft_tokens": nft_tokens,
@@ -565,13 +554,6 @@ async def show_token_address(
     tx_deployed = (
         CCD_BlockItemSummary(**api_result.return_value) if api_result.ok else None
     )
-    request.state.api_calls = {}
-    request.state.api_calls["Token Info"] = (
-        f"{request.app.api_url}/docs#/Token/get_info_for_token_address_v2__net__token__contract_index___contract_subindex___token_id__info_get"
-    )
-    request.state.api_calls["Token Mint Tx"] = (
-        f"{request.app.api_url}/docs#/Transaction/get_transaction_v2__net__transaction__tx_hash__get"
-    )
     template_dict = {
         "env": request.app.env,
         "request": request,
@@ -562,10 +562,6 @@ async def transactions_by_type_page(
     )
     tx_type_counts = api_result.return_value if api_result.ok else None
     tx_type_counts = {x["_id"]: x["count"] for x in tx_type_counts}  # type: ignore
-    request.state.api_calls = {}
-    request.state.api_calls["Latest Txs"] = (
-        f"{request.app.api_url}/docs#/Transactions/get_last_transactions_v2__net__transactions_last__count__get"
-    )
 
     return templates.TemplateResponse(
         "tools/transactions_by_type2.html",
@@ -773,11 +769,6 @@ async def accounts_scheduled_release(
 
     user: UserV2 | None = await get_user_detailsv2(request)
 
-    request.state.api_calls = {}
-    request.state.api_calls["Accounts Scheduled Release"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_scheduled_release_accounts_v2__net__accounts_scheduled_release_get"
-    )
-
     return templates.TemplateResponse(
         "tools/accounts-scheduled-release-content.html",
         {
@@ -871,16 +862,6 @@ async def accounts_cooldown(
 
     user: UserV2 | None = await get_user_detailsv2(request)
 
-    request.state.api_calls = {}
-    request.state.api_calls["Accounts Cooldown"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_cooldown_accounts_v2__net__accounts_cooldown_get"
-    )
-    request.state.api_calls["Accounts Pre Cooldown"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_pre_cooldown_accounts_v2__net__accounts_pre_cooldown_get"
-    )
-    request.state.api_calls["Accounts Pre Pre Cooldown"] = (
-        f"{request.app.api_url}/docs#/Accounts/get_pre_pre_cooldown_accounts_v2__net__accounts_pre_pre_cooldown_get"
-    )
     return templates.TemplateResponse(
         "tools/accounts-cooldown.html",
         {
@@ -20,7 +20,6 @@ async def get_transaction(
     tags: dict = Depends(get_labeled_accounts),
     httpx_client: httpx.AsyncClient = Depends(get_httpx_client),
 ):
-    request.state.api_calls = {}
 
     user: UserV2 | None = await get_user_detailsv2(request)
     api_result = await get_url_from_api(
@@ -54,9 +53,6 @@ async def get_transaction(
         result, "", False
     )
     tx_with_makeup = classified_tx.dct
-    request.state.api_calls["Transaction Info"] = (
-        f"{request.app.api_url}/docs#/Transaction/get_transaction_v2__net__transaction__tx_hash__get"
-    )
     return templates.TemplateResponse(
         "tx/tx.html",
         {
@@ -1,5 +1,4 @@
 from fastapi import Request
-import httpx
 from ccdexplorer_fundamentals.user_v2 import UserV2
 from ccdexplorer_fundamentals.mongodb import (
     Collections,
@@ -12,6 +11,9 @@ from ccdexplorer_fundamentals.enums import NET
 
 import datetime as dt
 
+from app.classes.reference_data import REFERENCE_ROUTES
+from app.utils import get_url_from_api
+
 
 # async def get_ccdscan(req: Request):
 #     return req.app.ccdscan
@@ -123,32 +125,24 @@ async def get_nightly_accounts(app):
     return app.nightly_accounts_by_account_id
 
 
-async def get_exchange_rates(
-    req: Request,
-):
-    if (
-        (
-            dt.datetime.now().astimezone(dt.timezone.utc)
-            - req.app.exchange_rates_last_requested
-        ).total_seconds()
-        < 10
-    ) and (req.app.exchange_rates):
-        pass
-        # print("exchange_rates from cache.")
-    else:
-        response = await req.app.httpx_client.get(
-            f"{req.app.api_url}/v2/mainnet/misc/exchange-rates"
+async def read_reference_data(app, field: str):
+    """
+    The field from the snapshot the reference data job keeps up to date. Only
+    fetched here if the job hasn't got it (yet).
+    """
+    value = getattr(app.reference_data, field)
+    if value is None:
+        api_result = await get_url_from_api(
+            f"{app.api_url}{REFERENCE_ROUTES[field]}", app.httpx_client
         )
-        response.raise_for_status()
-        coll = response.json()
+        value = api_result.return_value if api_result.ok else None
+    return value
 
-        req.app.exchange_rates = coll
-
-        req.app.exchange_rates_last_requested = dt.datetime.now().astimezone(
-            dt.timezone.utc
-        )
 
-    return req.app.exchange_rates
+async def get_exchange_rates(
+    req: Request,
+):
+    return await read_reference_data(req.app, "exchange_rates") or {}
 
 
 def get_exchange_rates_ccd_historical(
@@ -220,14 +214,10 @@ async def get_user_detailsv2(req: Request, token: str = None):
     if not token:
         token = req.cookies.get("access-token")
     if token:
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/site_user/{token}"
-            )
-            response.raise_for_status()
-            user = response.json()
-        except httpx.HTTPError:
-            user = None
+        api_result = await get_url_from_api(
+            f"{req.app.api_url}/v2/site_user/{token}", req.app.httpx_client
+        )
+        user = api_result.return_value if api_result.ok else None
     else:
         user = None
 
@@ -240,31 +230,7 @@ async def get_user_detailsv2(req: Request, token: str = None):
 async def get_credential_issuers(
     req: Request,
 ):
-    if (
-        (
-            dt.datetime.now().astimezone(dt.timezone.utc)
-            - req.app.credential_issuers_last_requested
-        ).total_seconds()
-        < 9
-    ) and (req.app.credential_issuers):
-        credential_issuers = req.app.credential_issuers
-        # print("credential_issuers from cache.")
-    else:
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/mainnet/misc/credential-issuers"
-            )
-            response.raise_for_status()
-            credential_issuers = response.json()
-            req.app.credential_issuers_last_requested = dt.datetime.now().astimezone(
-                dt.timezone.utc
-            )
-
-        except httpx.HTTPError:
-            credential_issuers = None
-        req.app.credential_issuers = credential_issuers
-
-    return credential_issuers
+    return await read_reference_data(req.app, "credential_issuers")
 
 
 async def get_httpx_client(req: Request):
@@ -274,95 +240,33 @@ async def get_httpx_client(req: Request):
 async def get_original_labeled_accounts(
     req: Request,
 ):
-    if (
-        (
-            dt.datetime.now().astimezone(dt.timezone.utc)
-            - req.app.labeled_accounts_last_requested
-        ).total_seconds()
-        < 9
-    ) and (req.app.tags):
-        tags: dict[str, MongoTypeTokensTag] = req.app.tags
-        # print("labeled_accounts from cache.")
-    else:
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/mainnet/misc/labeled-accounts"
-            )
-            response.raise_for_status()
-            tags = response.json()
-            req.app.labeled_accounts_last_requested = dt.datetime.now().astimezone(
-                dt.timezone.utc
-            )
-        except httpx.HTTPError:
-            req.app.tags = None
-            tags = None
-
-        return tags
+    tags: dict[str, MongoTypeTokensTag] = await read_reference_data(
+        req.app, "original_labeled_accounts"
+    )
+    return tags
 
 
 async def get_labeled_accounts(
     req: Request,
 ):
-    if (
-        (
-            dt.datetime.now().astimezone(dt.timezone.utc)
-            - req.app.labeled_accounts_last_requested
-        ).total_seconds()
-        < 9
-    ) and (req.app.tags):
-        tags: dict[str, MongoTypeTokensTag] = req.app.tags
-        # print("labeled_accounts from cache.")
-    else:
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/mainnet/misc/community-labeled-accounts"
-            )
-            response.raise_for_status()
-            tags = response.json()
-            req.app.labeled_accounts_last_requested = dt.datetime.now().astimezone(
-                dt.timezone.utc
-            )
-        except httpx.HTTPError:
-            req.app.tags = None
-            tags = None
-
-        return tags
+    tags: dict[str, MongoTypeTokensTag] = await read_reference_data(
+        req.app, "labeled_accounts"
+    )
+    return tags
 
 
 async def get_nodes(
     req: Request,
 ):
-    if (
-        (
-            dt.datetime.now().astimezone(dt.timezone.utc) - req.app.nodes_last_requested
-        ).total_seconds()
-        < 9
-    ) and (req.app.nodes):
-        nodes: dict[NET, dict] = req.app.nodes
-        # print("labeled_accounts from cache.")
-    else:
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/mainnet/misc/nodes"
-            )
-            response.raise_for_status()
-            mainnet_nodes = response.json()
-            req.app.nodes_last_requested = dt.datetime.now().astimezone(dt.timezone.utc)
-        except httpx.HTTPError:
-            mainnet_nodes = None
-
-        try:
-            response = await req.app.httpx_client.get(
-                f"{req.app.api_url}/v2/testnet/misc/nodes"
-            )
-            response.raise_for_status()
-            testnet_nodes = response.json()
-            req.app.nodes_last_requested = dt.datetime.now().astimezone(dt.timezone.utc)
-        except httpx.HTTPError:
-            testnet_nodes = None
-
-        nodes = {"mainnet": mainnet_nodes, "testnet": testnet_nodes}
-        return nodes
+    if req.app.reference_data.nodes is not None:
+        return req.app.reference_data.nodes
+    nodes: dict[NET, dict] = {}
+    for net in ["mainnet", "testnet"]:
+        api_result = await get_url_from_api(
+            f"{req.app.api_url}/v2/{net}/misc/nodes", req.app.httpx_client
+        )
+        nodes[net] = api_result.return_value if api_result.ok else None
+    return nodes
 
 
 # def get_memo_transfers(
@@ -6,10 +6,13 @@ import datetime as dt
 import json
 import math
 import re
+import tempfile
+import time
 import typing
 from datetime import timedelta
 from enum import Enum
 from functools import lru_cache
+from pathlib import Path
 from typing import Any, Optional
 
 import cbor2
@@ -42,6 +45,21 @@ from fastapi import FastAPI, Request
 from pydantic import BaseModel
 from rich import print
 
+from app.env import environment
+from app.classes.api_metrics import APIRouteMetrics
+from app.classes.api_trace import APICall, api_trace
+from app.classes.api_client import APIClientConfig, APIClientSettings, TimeoutClass
+from app.classes.circuit_breaker import CircuitBreakers
+from app.classes.hedging import HedgedRequests
+from app.classes.json_decoder import JSONDecoder
+from app.classes.job_metrics import JobMetrics
+from app.classes.json_stream import JSONArrayItemDecoder
+from app.classes.label_service import LabelService
+from app.classes.leader_election import LeaderElection, SnapshotStore
+from app.classes.live_updates import LiveUpdates
+from app.classes.response_cache import CachePolicy, ResponseCache
+from app.classes.singleflight import SingleFlight
+
 # from app.classes.dressingroom import MakeUp
 
 
@@ -619,10 +637,8 @@ def contract_tag(
 
     if not tag_label:
         if community_labels:
-            tag_found = value.to_str() in community_labels["labels_melt"]
-            if tag_found:
-                tag = community_labels["labels_melt"][value.to_str()]
-                tag_label = tag["label"]
+            tag_label = label_service.contract_label(value.to_str(), community_labels)
+            tag_found = tag_label is not None
 
         # if tags:
         #     tag_found = False
@@ -653,6 +669,8 @@ def instance_link_v2(
 ):
     if isinstance(user, dict):
         user = UserV2(**user)
+    if tags and net == "mainnet":
+        return label_service.contract_link(value, tags)
     tag_found, tag_label = contract_tag(value, user, tags)
     if not tag_found:
         tag_label = f"<cpan class='ccd'>{(value.to_str())}</span>"
@@ -874,12 +892,8 @@ def account_label_on_index(
 
     if not account_label:
         if community_labels:
-            account_labeled = str(account_index) in community_labels["labels_melt"]
-            # get_address_identifiers(str(account_index), net)
-            if account_labeled:
-
-                account_label = f'<i class="bi bi-person-bounding-box pe-1"></i><span style="font-family: monospace, monospace;" class="small">{community_labels["labels_melt"][str(account_index)]["label"]}</span>'
-                account_labeled = True
+            account_label = label_service.account_label(account_index, community_labels)
+            account_labeled = account_label is not None
         else:
             account_labeled = False
             account_label = None
@@ -887,6 +901,13 @@ def account_label_on_index(
     return account_labeled, account_label
 
 
+def has_personal_labels(user: UserV2 | dict | None) -> bool:
+    """Whether pages for this user differ from what anonymous visitors see."""
+    if isinstance(user, dict):
+        user = UserV2(**user)
+    return bool(user and user.accounts)
+
+
 def hex_to_rgba(hex: str, opacity: float):
     h = hex.lstrip("#")
     rgb = tuple(int(h[i : i + 2], 16) for i in (0, 2, 4))
@@ -894,63 +915,6 @@ def hex_to_rgba(hex: str, opacity: float):
     return rgba
 
 
-async def get_address_identifiers(account_address_or_index: str | int, net: str, app):
-    """Tranlate account_address to index. Note that this endpoint looks for canonical addresses."""
-    if isinstance(account_address_or_index, str):
-        account_address = account_address_or_index
-        canonical = account_address[:29]
-        account_index = None
-        if canonical not in app.addresses_to_indexes[net]:
-            api_response: APIResponseResult = await post_url_from_api(
-                f"{app.api_url}/v2/{net}/accounts/get-indexes",
-                app.httpx_client,
-                json_post_content=[canonical],
-            )
-            if api_response.ok:
-                app.addresses_to_indexes[net].update(
-                    {canonical: api_response.return_value[canonical]}
-                )
-
-                account_index = (
-                    api_response.return_value[canonical] if api_response.ok else None
-                )
-                return account_address, canonical, account_index
-            else:
-                return account_address, canonical, account_index
-        else:
-            account_index = app.addresses_to_indexes[net][canonical]
-            return account_address, canonical, account_index
-
-    else:
-        account_address = None
-        canonical = None
-        account_index = account_address_or_index
-
-        if account_index not in app.indexes_to_addresses[net]:
-            api_response: APIResponseResult = await post_url_from_api(
-                f"{app.api_url}/v2/{net}/accounts/get-addresses",
-                app.httpx_client,
-                json_post_content=[account_index],
-            )
-            if api_response.ok:
-                app.indexes_to_addresses[net].update(
-                    {account_index: api_response.return_value[account_index]}
-                )
-
-                account_address = (
-                    api_response.return_value[canonical]
-                    if api_response.ok
-                    else account_address
-                )
-                canonical = account_address[:29]
-                return account_address, canonical, account_index
-
-        else:
-            account_address = app.addresses_to_indexes[net][canonical]
-            canonical = account_address[:29]
-            return account_address, canonical, account_index
-
-
 def from_address_to_index(account_address: str, net: str, app):
     """Translate account_address to index. ."""
     if "." in net:
@@ -961,10 +925,10 @@ def from_address_to_index(account_address: str, net: str, app):
     except:  # noqa: E722
 
         canonical = account_address[:29]
-        if canonical not in app.addresses_to_indexes[net]:
+        account_index = app.addresses_to_indexes[net].get(canonical)
+        if account_index is None:
             return account_address
         else:
-            account_index = app.addresses_to_indexes[net][canonical]
             return int(account_index)
 
 
@@ -995,6 +959,8 @@ def account_link(
         return f'<a class="" href="/{net}/account/{value}">{tag_label}</a>'
 
     if isinstance(value, int):
+        if tags and not wallet_contract_address and not has_personal_labels(user):
+            return label_service.account_link(value, tags)
         tag_found, tag_label = account_label_on_index(value, user, tags, net, app)
     if not tag_found:
         if isinstance(value, str):
@@ -1529,70 +1495,434 @@ class APIResponseResult(BaseModel):
     ok: bool
     message: Optional[str] = None
     duration_in_sec: float
+    size_in_bytes: int = 0
+    # served from the cache because the upstream is failing.
+    stale: bool = False
 
     def get_value_if_ok_or_none(self):
         return
 
 
-async def get_url_from_api(url: str, httpx_client: httpx.AsyncClient):
+api_singleflight = SingleFlight()
+api_json_decoder = JSONDecoder(environment.get("API_JSON_DECODER"))
+
+# Caching rules for GET requests to the API, first match on the url path wins.
+# Urls that match no rule are never cached.
+API_CACHE_POLICIES = [
+    # finalized blocks and transactions never change, but a hash we don't know
+    # yet may show up a few seconds later.
+    CachePolicy(
+        name="transaction",
+        pattern=r"^/v2/\w+/transaction/[0-9a-f]{64}$",
+        ttl=None,
+        max_entries=5_000,
+        max_bytes=32 * 1024 * 1024,
+        negative_ttl=5,
+    ),
+    CachePolicy(
+        name="block",
+        pattern=r"^/v2/\w+/block/([0-9a-f]{64}|\d+)$",
+        ttl=None,
+        max_entries=2_000,
+        max_bytes=8 * 1024 * 1024,
+        negative_ttl=5,
+    ),
+    CachePolicy(
+        name="transaction_types",
+        pattern=r"^/v2/\w+/transaction_types$",
+        ttl=60 * 60,
+        max_entries=2,
+        stale_ttl=24 * 60 * 60,
+    ),
+    CachePolicy(
+        name="cns_domain",
+        pattern=r"^/v2/\w+/misc/cns-domain/",
+        ttl=60 * 60,
+        max_entries=5_000,
+        max_bytes=1024 * 1024,
+    ),
+    CachePolicy(
+        name="misc_lists",
+        pattern=r"^/v2/\w+/misc/(community-labeled-accounts|labeled-accounts|exchange-rates|credential-issuers|nodes|identity-providers)$",
+        ttl=10,
+        max_entries=20,
+        max_bytes=32 * 1024 * 1024,
+        stale_ttl=60 * 60,
+    ),
+    # optional contract page sections, kept briefly so a section that missed the
+    # page deadline is served from here when htmx asks for it.
+    CachePolicy(
+        name="contract_sections",
+        pattern=r"^/v2/\w+/contract/\d+/\d+/(deployed|supports-cis-standards|tag-info|tnt/ids)$",
+        ttl=10,
+        max_entries=200,
+        max_bytes=64 * 1024 * 1024,
+    ),
+    CachePolicy(
+        name="token_information",
+        pattern=r"^/v2/\w+/contract/\d+/\d+/token-information$",
+        ttl=5,
+        max_entries=2_000,
+        max_bytes=16 * 1024 * 1024,
+    ),
+    CachePolicy(
+        name="schema_from_source",
+        pattern=r"^/v2/\w+/contract/\d+/\d+/schema-from-source$",
+        ttl=5,
+        max_entries=200,
+        max_bytes=32 * 1024 * 1024,
+    ),
+    # users are looked up by session token, a deleted user or revoked token must
+    # stop resolving right away, and tokens don't belong in a shared cache.
+    CachePolicy(
+        name="site_user",
+        pattern=r"^/v2/site_user/",
+        no_store=True,
+    ),
+    # everything else isn't cached, but the last good response is kept to serve
+    # while the upstream is failing.
+    CachePolicy(
+        name="last_good",
+        pattern=r"^/v2/",
+        ttl=0,
+        max_entries=5_000,
+        max_bytes=64 * 1024 * 1024,
+        stale_ttl=15 * 60,
+    ),
+]
+api_response_cache = ResponseCache(API_CACHE_POLICIES)
+
+api_client_settings = APIClientSettings.from_environment(environment)
+# statistics, flows and event logs are aggregated on request by the API and can
+# take a while, everything else should be quick.
+API_TIMEOUT_CLASSES = [
+    TimeoutClass(
+        name="heavy",
+        pattern=(
+            r"/(statistics|statistics-chain|tx-data|graph|logged-events|"
+            r"nodes-validators|validators-failed-rounds)(/|$)|"
+            r"-for-flow/|/staking-rewards-"
+        ),
+        timeout=api_client_settings.heavy_timeout,
+    ),
+]
+api_client_config = APIClientConfig(api_client_settings, API_TIMEOUT_CLASSES)
+api_route_metrics = APIRouteMetrics()
+scheduler_job_metrics = JobMetrics(api_route_metrics.registry)
+
+# single lookups that gate a whole page, a slow replica shouldn't hold them up.
+HEDGED_ROUTES = [
+    r"^/v2/\w+/account/[^/]+/info$",
+    r"^/v2/\w+/block/([0-9a-f]{64}|\d+)$",
+    r"^/v2/\w+/transaction/[0-9a-f]{64}$",
+]
+api_hedged_requests = HedgedRequests(
+    HEDGED_ROUTES,
+    hedging=api_client_settings.hedging,
+    retries=api_client_settings.retries,
+)
+
+
+api_circuit_breakers = CircuitBreakers(failure_threshold=5, reset_timeout=15)
+
+# one worker refreshes the background caches and publishes them to the others.
+WORKER_SHARED_DIR = Path(
+    environment.get("WORKER_SHARED_DIR")
+    or Path(tempfile.gettempdir()) / "ccdexplorer-site"
+)
+worker_leader_election = LeaderElection(WORKER_SHARED_DIR / "scheduler.lock")
+worker_snapshots = SnapshotStore(WORKER_SHARED_DIR / "snapshots")
+live_updates = LiveUpdates()
+label_service = LabelService(api_route_metrics.registry)
+
+
+def decode_api_response(response: httpx.Response, raw: bool = False):
+    if raw:
+        # passthrough, the caller sends the bytes on as they are.
+        return response.content
+    try:
+        return api_json_decoder.loads(response.content)
+    except:  # noqa: E722
+        # if the response happens to be empty, json decoder gives an error.
+        return None
+
+
+def response_validators(response: httpx.Response) -> dict | None:
+    validators = {
+        header: response.headers[header]
+        for header in ["etag", "last-modified"]
+        if header in response.headers
+    }
+    return validators or None
+
+
+def conditional_headers(validators: dict) -> dict:
+    headers = {}
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last-modified" in validators:
+        headers["If-Modified-Since"] = validators["last-modified"]
+    return headers
+
+
+def trace_api_call(
+    method: str, url: str, status_code: int, size: int, start: float, source: str
+):
+    """Adds the call to the trace of the request being handled, if any."""
+    trace = api_trace.get()
+    if trace is None:
+        return
+    trace.record(
+        APICall(
+            method,
+            api_route_metrics.route_template(url),
+            url,
+            status_code,
+            start,
+            time.monotonic() - start,
+            size,
+            source,
+        )
+    )
+
+
+def trace_api_response(
+    method: str, url: str, api_response: APIResponseResult, start: float, source: str
+):
+    if api_response.stale:
+        source = "stale"
+    trace_api_call(
+        method,
+        url,
+        api_response.status_code,
+        api_response.size_in_bytes,
+        start,
+        source,
+    )
+
+
+def stale_api_response(url: str) -> APIResponseResult | None:
+    api_response = api_response_cache.get_stale(url)
+    if api_response is None or not api_response.ok:
+        return None
+    return api_response.model_copy(update={"stale": True})
+
+
+async def get_url_from_api(
+    url: str, httpx_client: httpx.AsyncClient, raw: bool = False
+):
+    start = time.monotonic()
+    key = ("GET", url, "raw") if raw else ("GET", url)
+    source = "coalesced" if key in api_singleflight.in_flight else "upstream"
+    if raw:
+        # raw bytes bypass the response cache, it holds decoded responses.
+        api_response = await api_singleflight.do(
+            key, lambda: _get_url_from_api(url, httpx_client, raw)
+        )
+        trace_api_response("GET", url, api_response, start, source)
+        return api_response
+    cached = api_response_cache.get(url)
+    if cached:
+        trace_api_response("GET", url, cached, start, "cached")
+        return cached
+
+    breaker = api_circuit_breakers.for_route(api_route_metrics.route_template(url))
+    if breaker.is_open():
+        # don't wait on a failing upstream, a single background probe finds out
+        # when it is back.
+        if breaker.should_probe():
+            breaker.probe(
+                api_singleflight.do(
+                    ("GET", url), lambda: _get_url_from_api(url, httpx_client)
+                )
+            )
+        breaker.short_circuited += 1
+        api_response = stale_api_response(url) or APIResponseResult(
+            status_code=-1, duration_in_sec=0, ok=False, message="Circuit open."
+        )
+        trace_api_response("GET", url, api_response, start, "circuit_open")
+        return api_response
+
+    api_response = await api_singleflight.do(
+        key, lambda: _get_url_from_api(url, httpx_client)
+    )
+    if (api_response.status_code == -1) or (api_response.status_code >= 500):
+        api_response = stale_api_response(url) or api_response
+    trace_api_response("GET", url, api_response, start, source)
+    return api_response
+
+
+async def _get_url_from_api(
+    url: str, httpx_client: httpx.AsyncClient, raw: bool = False
+):
     api_response = APIResponseResult(status_code=-1, duration_in_sec=-1, ok=False)
     response = None
+    # only an upstream that can't be reached counts against the circuit, a 5xx
+    # is an answer for that one url.
+    unreachable = False
     now = dt.datetime.now().astimezone(dt.UTC)
+    timeout_class = api_client_config.timeout_class_for(url)
+    # an expired response with an ETag/Last-Modified only needs to be
+    # downloaded (and decoded) again if it has changed.
+    previous = None if raw else api_response_cache.get_for_revalidation(url)
+    headers = conditional_headers(previous.validators) if previous else None
+    api_client_config.metrics.start()
     try:
-        response = await httpx_client.get(url)
-        try:
-            api_response.return_value = response.json()
-        except:  # noqa: E722
-            # if the response happens to be empty, json decoder gives an error.
-            api_response.return_value = None
-        api_response.status_code = response.status_code
-        api_response.ok = True if response.status_code == 200 else False
-    except httpx.HTTPError:
-        api_response.return_value = None
-        if response:
-            api_response.status_code = response.status_code
-            api_response.return_value = response.json()
-    except asyncio.CancelledError:
-        api_response.return_value = None
-        if response:
+        response = await api_hedged_requests.get(
+            httpx_client,
+            url,
+            api_route_metrics.route_template(url),
+            headers=headers,
+            timeout=api_client_config.timeouts[timeout_class],
+        )
+        if response.status_code == 304 and previous:
+            api_response.return_value = previous.value.return_value
+            api_response.status_code = 200
+        else:
+            api_response.return_value = decode_api_response(response, raw)
             api_response.status_code = response.status_code
-            api_response.return_value = response.json()
+        api_response.ok = True if api_response.status_code == 200 else False
+    except httpx.HTTPError as error:
+        unreachable = isinstance(error, httpx.TransportError)
+        if isinstance(error, httpx.TimeoutException):
+            api_client_config.metrics.timed_out(timeout_class, error)
+    finally:
+        # a cancelled call (deadline, search early exit, a hedge that lost)
+        # raises on to whoever awaits it.
+        api_client_config.metrics.end()
 
     end = dt.datetime.now().astimezone(dt.UTC)
 
     api_response.duration_in_sec = (end - now).total_seconds()
+    if response is not None:
+        api_response.size_in_bytes = len(response.content)
+    api_route_metrics.observe(
+        "GET",
+        url,
+        api_response.status_code,
+        api_response.duration_in_sec,
+        api_response.size_in_bytes,
+    )
     if not api_response:
         api_response = APIResponseResult(status_code=-1, duration_in_sec=-1, ok=False)
+    if (response is not None) and not raw:
+        if response.status_code == 304 and previous:
+            api_response_cache.revalidated(url, previous, api_response)
+        else:
+            api_response_cache.put(
+                url,
+                api_response,
+                api_response.status_code,
+                len(response.content),
+                response_validators(response),
+            )
+    breaker = api_circuit_breakers.for_route(api_route_metrics.route_template(url))
+    if unreachable:
+        breaker.record_failure()
+    elif response is not None:
+        breaker.record_success()
     # print(
     #     f"GET: {api_response.duration_in_sec:2,.4f}s | {api_response.status_code} | {url}"
     # )
     return api_response
 
 
+class APIStreamError(Exception):
+    """A streamed API response failed, the items yielded so far are incomplete."""
+
+
+async def stream_url_from_api(url: str, httpx_client: httpx.AsyncClient):
+    """
+    Yields the items of the JSON array at url as they arrive, so the whole
+    array never has to be in memory. Raises APIStreamError if the request
+    fails, also halfway through the array.
+    """
+    timeout_class = api_client_config.timeout_class_for(url)
+    api_client_config.metrics.start()
+    start = time.monotonic()
+    status_code = -1
+    size = 0
+    try:
+        async with httpx_client.stream(
+            "GET", url, timeout=api_client_config.timeouts[timeout_class]
+        ) as response:
+            status_code = response.status_code
+            if response.status_code != 200:
+                raise APIStreamError(f"{url} returned {response.status_code}.")
+            decoder = JSONArrayItemDecoder()
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                for item in decoder.feed(chunk):
+                    yield item
+            for item in decoder.close():
+                yield item
+    except httpx.HTTPError as error:
+        if isinstance(error, httpx.TimeoutException):
+            api_client_config.metrics.timed_out(timeout_class, error)
+        print(f"ERROR streaming {url}: {error}")
+        raise APIStreamError(f"{url} failed: {error}") from error
+    except ValueError as error:
+        print(f"ERROR streaming {url}: {error}")
+        raise APIStreamError(f"{url} is not a JSON array: {error}") from error
+    finally:
+        api_client_config.metrics.end()
+        api_route_metrics.observe(
+            "GET", url, status_code, time.monotonic() - start, size
+        )
+        trace_api_call("GET", url, status_code, size, start, "upstream")
+
+
 async def post_url_from_api(
-    url: str, httpx_client: httpx.AsyncClient, json_post_content: Any
+    url: str, httpx_client: httpx.AsyncClient, json_post_content: Any, raw: bool = False
+):
+    # POSTs to the API are lookups (get-indexes, get-addresses, ...), so identical
+    # bodies can share one upstream call.
+    start = time.monotonic()
+    body_key = json.dumps(json_post_content, sort_keys=True, default=str)
+    key = ("POST", url, body_key, raw)
+    source = "coalesced" if key in api_singleflight.in_flight else "upstream"
+    api_response = await api_singleflight.do(
+        key, lambda: _post_url_from_api(url, httpx_client, json_post_content, raw)
+    )
+    trace_api_response("POST", url, api_response, start, source)
+    return api_response
+
+
+async def _post_url_from_api(
+    url: str, httpx_client: httpx.AsyncClient, json_post_content: Any, raw: bool = False
 ):
     api_response = APIResponseResult(status_code=-1, duration_in_sec=-1, ok=False)
     response = None
     now = dt.datetime.now().astimezone(dt.UTC)
+    timeout_class = api_client_config.timeout_class_for(url)
+    api_client_config.metrics.start()
     try:
-        response = await httpx_client.post(url, json=json_post_content)
-        try:
-            api_response.return_value = response.json()
-        except:  # noqa: E722
-            # if the response happens to be empty, json decoder gives an error.
-            api_response.return_value = None
+        response = await httpx_client.post(
+            url,
+            json=json_post_content,
+            timeout=api_client_config.timeouts[timeout_class],
+        )
+        api_response.return_value = decode_api_response(response, raw)
         api_response.status_code = response.status_code
         api_response.ok = True if response.status_code == 200 else False
-    except httpx.HTTPError:
-        api_response.return_value = None
-        if response:
-            api_response.status_code = response.status_code
-            api_response.return_value = response.json()
+    except httpx.HTTPError as error:
+        if isinstance(error, httpx.TimeoutException):
+            api_client_config.metrics.timed_out(timeout_class, error)
+    finally:
+        api_client_config.metrics.end()
 
     end = dt.datetime.now().astimezone(dt.UTC)
 
     api_response.duration_in_sec = (end - now).total_seconds()
+    if response is not None:
+        api_response.size_in_bytes = len(response.content)
+    api_route_metrics.observe(
+        "POST",
+        url,
+        api_response.status_code,
+        api_response.duration_in_sec,
+        api_response.size_in_bytes,
+    )
     # print(
     #     f"POST: {api_response.duration_in_sec:2,.4f}s | {api_response.status_code} | {url}"
     # )
@@ -1600,29 +1930,42 @@ async def post_url_from_api(
 
 
 async def put_url_from_api(
-    url: str, httpx_client: httpx.AsyncClient, json_put_content: list
+    url: str, httpx_client: httpx.AsyncClient, json_put_content: list, raw: bool = False
 ):
     api_response = APIResponseResult(status_code=-1, duration_in_sec=-1, ok=False)
     response = None
+    start = time.monotonic()
     now = dt.datetime.now().astimezone(dt.UTC)
+    timeout_class = api_client_config.timeout_class_for(url)
+    api_client_config.metrics.start()
     try:
-        response = await httpx_client.put(url, json=json_put_content)
-        try:
-            api_response.return_value = response.json()
-        except:  # noqa: E722
-            # if the response happens to be empty, json decoder gives an error.
-            api_response.return_value = None
+        response = await httpx_client.put(
+            url,
+            json=json_put_content,
+            timeout=api_client_config.timeouts[timeout_class],
+        )
+        api_response.return_value = decode_api_response(response, raw)
         api_response.status_code = response.status_code
         api_response.ok = True if response.status_code == 200 else False
-    except httpx.HTTPError:
-        api_response.return_value = None
-        if response:
-            api_response.status_code = response.status_code
-            api_response.return_value = response.json()
+    except httpx.HTTPError as error:
+        if isinstance(error, httpx.TimeoutException):
+            api_client_config.metrics.timed_out(timeout_class, error)
+    finally:
+        api_client_config.metrics.end()
 
     end = dt.datetime.now().astimezone(dt.UTC)
 
     api_response.duration_in_sec = (end - now).total_seconds()
+    if response is not None:
+        api_response.size_in_bytes = len(response.content)
+    api_route_metrics.observe(
+        "PUT",
+        url,
+        api_response.status_code,
+        api_response.duration_in_sec,
+        api_response.size_in_bytes,
+    )
+    trace_api_response("PUT", url, api_response, start, "upstream")
     print(f"PUT: {api_response.duration_in_sec:2,.4f}s for {url}")
     return api_response
 
@@ -1687,7 +2030,7 @@ def split_contract_into_url_slug_and_token_id(contract_str: str, token_id: str):
 
 def add_account_info_to_cache(account_info: CCD_AccountInfo, app: FastAPI, net: str):
     app.addresses_to_indexes[net][account_info.address[:29]] = account_info.index  # type: ignore
-    app.max_index_known[net] = max(app.addresses_to_indexes[net].values())  # type: ignore
+    app.max_index_known[net] = max(app.max_index_known[net], account_info.index)  # type: ignore
 
 
 def apy_perc(value):
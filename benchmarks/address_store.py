@@ -0,0 +1,115 @@
+"""
+Startup time, memory and lookup time of the address to index pickles vs the
+memory mapped address stores, per worker. Run from the repo root:
+
+    python -m benchmarks.address_store
+
+Every variant loads in a fresh interpreter. Private memory is what a worker
+doesn't share with the others (Linux only). The store's pages are in the
+page cache, and every worker shares them.
+
+Lookups are timed for uniformly random addresses, and for a skewed mix where
+most lookups are for a few busy accounts (like the pages people look at),
+which the store's LRU answers without a search.
+"""
+
+import pickle
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from app.classes.address_store import open_address_store
+
+ADDRESSES_DIR = Path(__file__).parent.parent / "addresses"
+LOOKUPS = 100_000
+# share of the skewed lookups that go to the HOT busiest accounts.
+HOT = 1_000
+HOT_SHARE = 0.9
+
+
+def memory() -> dict[str, int]:
+    """RSS and private memory of this process, in kB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as fp:
+        for line in fp:
+            name, _, rest = line.partition(":")
+            if name in ["Rss", "Private_Clean", "Private_Dirty"]:
+                values[name] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def positions(count: int, skewed: bool) -> list[int]:
+    rng = random.Random(0)
+    if not skewed:
+        return rng.choices(range(count), k=LOOKUPS)
+    return [
+        rng.randrange(HOT) if rng.random() < HOT_SHARE else rng.randrange(count)
+        for _ in range(LOOKUPS)
+    ]
+
+
+def time_lookups(addresses_to_indexes, sample: list[str]) -> float:
+    start = time.perf_counter()
+    for canonical in sample:
+        addresses_to_indexes.get(canonical)
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+def load(variant: str):
+    before = memory()
+    start = time.perf_counter()
+    if variant == "pickle":
+        with open(ADDRESSES_DIR / "mainnet_addresses_to_indexes.pickle", "rb") as fp:
+            addresses_to_indexes = pickle.load(fp)
+    else:
+        addresses_to_indexes = open_address_store(ADDRESSES_DIR, "mainnet")
+    load_time = time.perf_counter() - start
+    after = memory()
+
+    if variant == "pickle":
+        keys = list(addresses_to_indexes)
+        canonical_at = keys.__getitem__
+    else:
+        canonical_at = lambda i: addresses_to_indexes.keys[i].decode()  # noqa: E731
+    samples = [
+        [canonical_at(i) for i in positions(len(addresses_to_indexes), skewed)]
+        for skewed in [False, True]
+    ]
+    # what the lookups themselves keep in memory (the store's LRU).
+    before_lookups = memory()
+    lookup_times = [time_lookups(addresses_to_indexes, sample) for sample in samples]
+    after_lookups = memory()
+
+    print(
+        f"{variant:<8}{load_time * 1000:>10.1f}ms"
+        f"{(after['rss'] - before['rss']) / 1024:>12.1f}MB"
+        f"{(after['private'] - before['private']) / 1024:>12.1f}MB"
+        f"{lookup_times[0] * 1_000_000:>12.2f}us"
+        f"{lookup_times[1] * 1_000_000:>12.2f}us"
+        f"{(after_lookups['private'] - before_lookups['private']) / 1024:>12.1f}MB"
+    )
+
+
+def run():
+    # builds the store first, if needed, so that isn't part of the timing.
+    open_address_store(ADDRESSES_DIR, "mainnet")
+    print(
+        f"{'':<8}{'load':>12}{'rss':>14}{'private':>14}{'uniform':>14}"
+        f"{'skewed':>14}{'lookups':>14}"
+    )
+    for variant in ["pickle", "store"]:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.address_store", variant], check=True
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        load(sys.argv[1])
+    else:
+        run()
@@ -0,0 +1,101 @@
+"""
+Checks that cancelling API calls reaches whoever awaits them, against a slow
+mock upstream, no API needed:
+
+    python -m benchmarks.cancellation
+
+- a caller that is cancelled while sharing (coalescing) a fetch with another
+  caller sees the cancellation, the other caller still gets the response.
+- cancelling the shared fetch itself cancels its waiters, they don't get an
+  error response instead.
+- cancelling a hedged fetch cancels both attempts at the upstream.
+"""
+
+import asyncio
+
+import httpx
+
+from app.utils import (
+    api_hedged_requests,
+    api_route_metrics,
+    api_singleflight,
+    get_url_from_api,
+)
+
+UPSTREAM_DELAY = 0.3
+
+
+class Upstream:
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.started += 1
+        try:
+            await asyncio.sleep(UPSTREAM_DELAY)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(200, content=b'{"ok": true}')
+
+
+async def cancelled(task: asyncio.Task) -> bool:
+    try:
+        await task
+    except asyncio.CancelledError:
+        return True
+    return False
+
+
+async def check_coalesced(client: httpx.AsyncClient, upstream: Upstream):
+    url = "http://api.test/v2/mainnet/account/1/info"
+    first = asyncio.ensure_future(get_url_from_api(url, client))
+    second = asyncio.ensure_future(get_url_from_api(url, client))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    assert await cancelled(first)
+    result = await second
+    assert result.ok and result.return_value == {"ok": True}
+    assert upstream.started == 1
+    print("coalesced: the cancelled caller sees it, the other gets the response.")
+
+    waiter = asyncio.ensure_future(get_url_from_api(url, client))
+    await asyncio.sleep(0.05)
+    api_singleflight.in_flight[("GET", url)].cancel()
+    assert await cancelled(waiter)
+    assert upstream.cancelled == 1
+    print("shared fetch: cancelling it cancels the waiter, no error response.")
+
+
+async def check_hedged(client: httpx.AsyncClient, upstream: Upstream):
+    url = "http://api.test/v2/mainnet/block/123"
+    route = api_route_metrics.route_template(url)
+    api_hedged_requests.hedging = True
+    # a p95 well below the upstream delay, so the hedge goes out.
+    for _ in range(api_hedged_requests.latency.min_samples):
+        api_hedged_requests.latency.record(route, 0.05)
+    try:
+        waiter = asyncio.ensure_future(get_url_from_api(url, client))
+        await asyncio.sleep(0.15)
+        assert upstream.started == 2
+        api_singleflight.in_flight[("GET", url)].cancel()
+        assert await cancelled(waiter)
+        await asyncio.sleep(0)
+        assert upstream.cancelled == 2
+    finally:
+        api_hedged_requests.hedging = False
+    print("hedged: cancelling the fetch cancels both attempts.")
+
+
+async def check():
+    for check_one in [check_coalesced, check_hedged]:
+        upstream = Upstream()
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(upstream.handle)
+        ) as client:
+            await check_one(client, upstream)
+
+
+if __name__ == "__main__":
+    asyncio.run(check())
@@ -0,0 +1,91 @@
+"""
+Decode time of the stdlib json decoder vs orjson on (large) API payloads.
+
+Record payloads from the API first (uses API_URL and CCDEXPLORER_API_KEY from .env):
+
+    python -m benchmarks.json_decode record
+
+then run the benchmark over everything in benchmarks/payloads:
+
+    python -m benchmarks.json_decode run
+
+Without recorded payloads, `run` uses a generated payload shaped like a
+logged-events response.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from app.classes.json_decoder import JSONDecoder
+from app.env import environment
+
+PAYLOADS_DIR = Path(__file__).parent / "payloads"
+
+# the payloads that hurt most, see the routers that use them.
+ENDPOINTS = {
+    "tnt_logged_events": "/v2/mainnet/contract/9403/0/tnt/logged-events",
+    "nodes_validators": "/v2/mainnet/accounts/nodes-validators",
+    "staking_pools": "/v2/mainnet/accounts/paydays/pools/open_for_all",
+    "statistics": "/v2/mainnet/misc/statistics-chain/2024-01-01/2025-01-01",
+    "transactions_last": "/v2/mainnet/transactions/last/50",
+}
+
+
+def record():
+    PAYLOADS_DIR.mkdir(exist_ok=True)
+    headers = {"x-ccdexplorer-key": environment["CCDEXPLORER_API_KEY"]}
+    with httpx.Client(headers=headers, timeout=120) as client:
+        for name, path in ENDPOINTS.items():
+            response = client.get(f"{environment['API_URL']}{path}")
+            if response.status_code != 200:
+                print(f"{name}: {response.status_code}, skipped.")
+                continue
+            (PAYLOADS_DIR / f"{name}.json").write_bytes(response.content)
+            print(f"{name}: {len(response.content):,} bytes.")
+
+
+def generated_payload() -> bytes:
+    event = (
+        '{"tx_hash": "%064x", "event_type": "transfer_event", '
+        '"block_height": %d, "ordering": %d, "result": {"tag": 255, '
+        '"token_id": "", "token_amount": "%d", "from_address": '
+        '"3BFChzvx3783jGUKgHVCanFVxyDAn5xT3Y5NL5FKydVMuBa7Bm", '
+        '"to_address": "4AuT5RRmBwcdkLMA6iVjxTDb1FQmxwAh3wHBS22mggWL8xH6s3"}}'
+    )
+    events = ",".join(event % (i, 10_000_000 + i, i, i * 1_000) for i in range(50_000))
+    return f"[{events}]".encode()
+
+
+def run(rounds: int = 10):
+    payloads = {p.stem: p.read_bytes() for p in sorted(PAYLOADS_DIR.glob("*.json"))}
+    if not payloads:
+        payloads = {"generated_logged_events": generated_payload()}
+
+    decoders = {
+        backend: JSONDecoder(backend)
+        for backend in ["json", "orjson"]
+        if JSONDecoder(backend).backend == backend
+    }
+    print(f"{'payload':<28}{'bytes':>14}" + "".join(f"{d:>12}" for d in decoders))
+    for name, content in payloads.items():
+        timings = {}
+        for backend, decoder in decoders.items():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                decoder.loads(content)
+            timings[backend] = (time.perf_counter() - start) / rounds
+        line = f"{name:<28}{len(content):>14,}"
+        line += "".join(f"{timings[d] * 1000:>10.2f}ms" for d in decoders)
+        if len(timings) == 2:
+            line += f"  {timings['json'] / timings['orjson']:.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        record()
+    else:
+        run()
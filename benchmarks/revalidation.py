@@ -0,0 +1,67 @@
+"""
+Checks the ETag/304 revalidation path of `get_url_from_api` against a mock
+upstream, no API needed:
+
+    python -m benchmarks.revalidation
+
+The upstream answers the first request with a body and an ETag, and any
+request with a matching If-None-Match with an empty 304. Once the cached
+response has expired, the next call has to send the ETag, serve the cached
+body for the 304 and make the entry fresh for another ttl.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.utils import api_response_cache, get_url_from_api
+
+URL = "http://api.test/v2/mainnet/misc/exchange-rates"
+ETAG = '"exchange-rates-1"'
+BODY = b'{"CCD": {"rate": 0.0042}}'
+
+
+class Upstream:
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers={"etag": ETAG})
+        return httpx.Response(200, headers={"etag": ETAG}, content=BODY)
+
+
+async def check():
+    upstream = Upstream()
+    policy = api_response_cache.policy_for(URL)
+    store = api_response_cache.stores[policy.name]
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(upstream.handle)
+    ) as client:
+        first = await get_url_from_api(URL, client)
+        assert first.ok and first.return_value == {"CCD": {"rate": 0.0042}}
+        assert store.entries[URL].validators == {"etag": ETAG}
+        print(f"200: cached with etag {ETAG}, ttl {policy.ttl}s.")
+
+        # expire it, it stays around for revalidation in the stale window.
+        store.entries[URL].expires_at = time.monotonic() - 1
+        second = await get_url_from_api(URL, client)
+        assert len(upstream.requests) == 2
+        assert upstream.requests[1].headers["if-none-match"] == ETAG
+        assert second.ok and second.status_code == 200
+        assert second.return_value == first.return_value
+        assert store.revalidated == 1
+        remaining = store.entries[URL].expires_at - time.monotonic()
+        assert policy.ttl - 1 < remaining <= policy.ttl
+        print(f"304: cached body served, entry fresh for another {remaining:.1f}s.")
+
+        third = await get_url_from_api(URL, client)
+        assert len(upstream.requests) == 2
+        assert third.return_value == first.return_value
+        print("fresh again: served from the cache, upstream not asked.")
+
+
+if __name__ == "__main__":
+    asyncio.run(check())